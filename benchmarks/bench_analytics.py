@@ -0,0 +1,135 @@
+"""Benchmark: agregatele de raport prin ORM vs pandas vectorizat vs snapshot columnar
+
+Rulare: python -m benchmarks.bench_analytics [--events 1000000] [--days 30]
+
+Populează `activity_log` cu `events` acțiuni distribuite pe `days` zile, apoi
+calculează rata de succes pe tip de acțiune și oră a zilei:
+  - orm:      iterare pe obiecte ActivityLog + agregare în dict-uri Python
+  - pandas:   read_sql în bucăți în DataFrame tipizat + groupby
+  - parquet / arrow: același groupby din snapshot-ul exportat (dacă e instalat pyarrow)
+Rezultatele celor trei variante sunt comparate la final.
+"""
+import argparse
+import importlib.util
+import random
+import sqlite3
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy.orm import sessionmaker
+
+from src.models.db import Base, create_db_engine
+from src.models.activity import ActivityLog
+from src.utils import analytics
+
+ACTIONS = ('like', 'comment', 'mention', 'follow')
+
+
+def seed(db_path: Path, events: int, days: int):
+    """Populează activity_log direct prin sqlite3, în loturi"""
+    now = datetime.utcnow()
+    rng = random.Random(42)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous=OFF")
+    batch = 100_000
+    for start in range(0, events, batch):
+        rows = []
+        for i in range(start, min(start + batch, events)):
+            ts = (now - timedelta(seconds=rng.randrange(days * 86400))).strftime('%Y-%m-%d %H:%M:%S.%f')
+            status = 'success' if rng.random() < 0.9 else 'error'
+            rows.append((i + 1, rng.choice(ACTIONS), status, f'post{i:08d}',
+                         rng.uniform(50, 900), None, ts))
+        conn.executemany("INSERT INTO activity_log VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.commit()
+    conn.close()
+
+
+def sqlite_size(db_path: Path) -> int:
+    """Baza plus jurnalul WAL, după checkpoint"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    wal_path = db_path.with_name(db_path.name + '-wal')
+    return db_path.stat().st_size + (wal_path.stat().st_size if wal_path.exists() else 0)
+
+
+def orm_success_rate(session_factory, since: datetime):
+    totals = defaultdict(int)
+    successes = defaultdict(int)
+    session = session_factory()
+    try:
+        query = session.query(ActivityLog).filter(ActivityLog.created_at >= since)
+        for entry in query.yield_per(10_000):
+            key = (entry.action_type, entry.created_at.hour)
+            totals[key] += 1
+            successes[key] += entry.status == 'success'
+    finally:
+        session.close()
+    return {key: round(successes[key] / totals[key] * 100, 2) for key in totals}
+
+
+def frame_success_rate(activity):
+    table = analytics.success_rate_by_hour(activity)
+    return {(action, hour): value for (action, hour), value in table.stack().items()}
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=1_000_000)
+    parser.add_argument('--days', type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        db_path = tmp / 'bench.db'
+        engine = create_db_engine(f'sqlite:///{db_path}')
+        Base.metadata.create_all(bind=engine)
+        print(f"Seeding {args.events} activity rows over {args.days} days...")
+        seed(db_path, args.events, args.days)
+        since = datetime.utcnow() - timedelta(days=args.days)
+
+        results = {}
+        results['orm'] = timed(lambda: orm_success_rate(sessionmaker(bind=engine), since))
+
+        activity, load_seconds = timed(lambda: analytics.load_table('activity', since, engine))
+        rates, group_seconds = timed(lambda: frame_success_rate(activity))
+        results['pandas'] = (rates, load_seconds + group_seconds)
+        print(f"pandas: load {load_seconds:.2f}s, groupby {group_seconds * 1000:.1f}ms, "
+              f"{activity.memory_usage(deep=True).sum() / 2**20:.1f} MiB in memory")
+
+        if importlib.util.find_spec('pyarrow') is None:
+            print("pyarrow not installed, skipping snapshot variants")
+        else:
+            for fmt in ('parquet', 'arrow'):
+                out_dir = tmp / f'snapshot_{fmt}'
+                analytics.export_snapshot({'activity': activity}, out_dir, fmt)
+                size = sum(path.stat().st_size for path in out_dir.iterdir())
+                results[fmt] = timed(
+                    lambda out_dir=out_dir: frame_success_rate(analytics.load_snapshot(out_dir)['activity'])
+                )
+                print(f"{fmt}: snapshot {size / 2**20:.1f} MiB "
+                      f"(sqlite {sqlite_size(db_path) / 2**20:.1f} MiB)")
+
+        print(f"\n{'variant':>8} | {'seconds':>8} | speedup vs orm")
+        baseline = results['orm'][1]
+        for name, (_, seconds) in results.items():
+            print(f"{name:>8} | {seconds:>8.2f} | {baseline / seconds:>6.1f}x")
+
+        expected = results['orm'][0]
+        for name, (rates, _) in results.items():
+            mismatched = [key for key in expected if abs(rates.get(key, -1) - expected[key]) > 0.01]
+            assert not mismatched and len(rates) == len(expected), f"{name} differs from orm: {mismatched[:5]}"
+        print("All variants agree")
+
+
+if __name__ == '__main__':
+    main()
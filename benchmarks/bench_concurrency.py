@@ -0,0 +1,83 @@
+"""Stress benchmark: MetricsTracker și RateLimiter sub mai multe thread-uri
+
+Rulare: python -m benchmarks.bench_concurrency [--ops 20000]
+
+Pentru fiecare număr de thread-uri verifică că nu se pierde nicio
+actualizare (contoarele finale == operațiile făcute) și raportează
+throughput-ul. Un thread cititor apelează continuu get_daily_stats /
+get_totals, ca dashboard-ul.
+"""
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from src.utils.metrics import MetricsTracker
+from src.utils.rate_limiter import RateLimiter
+
+
+def run(threads: int, ops: int, tmp: Path) -> dict:
+    metrics = MetricsTracker(str(tmp / f'metrics_{threads}.json'), batch_size=500)
+    limiter = RateLimiter()
+    limiter.limits['like'] = {'max': 10 ** 9, 'per_hour': 10 ** 9}
+    barrier = threading.Barrier(threads + 1)
+    stop_reader = threading.Event()
+    reads = [0]
+
+    def writer():
+        barrier.wait()
+        for i in range(ops):
+            metrics.track_action('likes', i % 10 != 0, {'error': 'timeout'} if i % 10 == 0 else None)
+            metrics.increment('bench_events')
+            limiter.try_acquire('like')
+
+    def reader():
+        while not stop_reader.is_set():
+            metrics.get_daily_stats()
+            metrics.get_totals()
+            reads[0] += 1
+
+    workers = [threading.Thread(target=writer) for _ in range(threads)]
+    reader_thread = threading.Thread(target=reader)
+    for thread in workers:
+        thread.start()
+    reader_thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop_reader.set()
+    reader_thread.join()
+    metrics.save_metrics()
+
+    expected = threads * ops
+    totals = metrics.get_totals()['likes']
+    daily = metrics.get_daily_stats()
+    lost = {
+        'totals': expected - (totals['success'] + totals['failure']),
+        'daily': expected - (daily['successful_requests'] + daily['failed_requests']),
+        'counters': expected - metrics.get_counters()['bench_events'],
+        'rate_limiter': expected - len(limiter.actions['like']),
+        'event_log': expected - sum(1 for _ in open(metrics.events_file)),
+    }
+    return {'threads': threads, 'ops_per_sec': expected / elapsed, 'reads': reads[0], 'lost': lost}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--ops', type=int, default=20_000, help='operații per thread')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'threads':>7} | {'ops/s':>10} | {'reader calls':>12} | lost updates")
+        for threads in (1, 2, 4, 8, 16):
+            result = run(threads, args.ops, Path(tmp))
+            print(f"{result['threads']:>7} | {result['ops_per_sec']:>10.0f} | "
+                  f"{result['reads']:>12} | {result['lost']}")
+            assert not any(result['lost'].values()), 'lost updates detected'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark: interogările dashboard-ului înainte și după indexuri (migrate_db)
+
+Rulare: python -m benchmarks.bench_db_indexes [--rows 1000000]
+
+Creează o bază SQLite temporară cu `rows` conversații (și câte o interacțiune
+pentru fiecare), fără indexurile noi, măsoară interogările, rulează
+migrate_db și le măsoară din nou.
+"""
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import desc
+from sqlalchemy.orm import sessionmaker
+
+from src.models.db import Base, create_db_engine, migrate_db
+from src.models.conversation import Conversation
+from src.models.interaction import Interaction
+from src.dashboard.routes import get_activity_data
+
+
+def seed(db_path: Path, rows: int, days: int = 90):
+    """Populează tabelele direct prin sqlite3, în loturi"""
+    now = datetime.utcnow()
+    rng = random.Random(42)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous=OFF")
+    batch = 50_000
+    for start in range(0, rows, batch):
+        conversations, interactions = [], []
+        for i in range(start, min(start + batch, rows)):
+            ts = (now - timedelta(seconds=rng.randrange(days * 86400))).strftime('%Y-%m-%d %H:%M:%S.%f')
+            conversations.append((i + 1, f'post{i:08d}', None, rng.random() < 0.2, 1, ts, ts))
+            interactions.append((i + 1, i + 1, 'like', None, None, 'outgoing', ts))
+        conn.executemany("INSERT INTO conversations VALUES (?, ?, ?, ?, ?, ?, ?)", conversations)
+        conn.executemany("INSERT INTO interactions VALUES (?, ?, ?, ?, ?, ?, ?)", interactions)
+        conn.commit()
+    conn.close()
+
+
+def queries(session, now):
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    conversation_id = session.query(Conversation.id).order_by(desc(Conversation.id)).limit(1).scalar()
+    return {
+        'activity_histogram_24h': lambda: get_activity_data(session, now),
+        'active_conversations_today': lambda: session.query(Conversation).filter(
+            Conversation.is_active == True,
+            Conversation.last_interaction >= today
+        ).count(),
+        'recent_50_by_last_interaction': lambda: session.query(Conversation).order_by(
+            Conversation.last_interaction.desc()
+        ).limit(50).all(),
+        'interactions_for_conversation': lambda: session.query(Interaction).filter(
+            Interaction.conversation_id == conversation_id
+        ).order_by(Interaction.created_at).all(),
+    }
+
+
+def time_queries(session, repeat: int):
+    now = datetime.utcnow()
+    results = {}
+    for name, query in queries(session, now).items():
+        query()  # încălzire cache
+        start = time.perf_counter()
+        for _ in range(repeat):
+            query()
+        results[name] = (time.perf_counter() - start) / repeat * 1000
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'bench.db'
+        engine = create_db_engine(f'sqlite:///{db_path}')
+        Base.metadata.create_all(bind=engine)
+        # Simulează o bază creată de versiunea fără indexuri
+        with engine.begin() as conn:
+            for table in (Conversation.__table__, Interaction.__table__):
+                for index in table.indexes:
+                    index.drop(bind=conn)
+
+        started = time.perf_counter()
+        seed(db_path, args.rows)
+        print(f"seeded {args.rows} conversations + interactions in {time.perf_counter() - started:.1f}s")
+
+        Session = sessionmaker(bind=engine)
+        session = Session()
+        before = time_queries(session, args.repeat)
+
+        started = time.perf_counter()
+        migrate_db(engine)
+        print(f"migrate_db (index build) took {time.perf_counter() - started:.1f}s")
+        after = time_queries(session, args.repeat)
+        session.close()
+
+    print(f"{'query':>32} | {'before ms':>10} | {'after ms':>10}")
+    for name in before:
+        print(f"{name:>32} | {before[name]:>10.2f} | {after[name]:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
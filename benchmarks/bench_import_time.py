@@ -0,0 +1,120 @@
+"""Buget de timp la import pentru modulele de intrare (dashboard, scheduler, CLI)
+
+Rulare: python -m benchmarks.bench_import_time [--runs 5] [--audit MODULE]
+
+Fiecare modul e importat într-un proces nou (de `runs` ori, se păstrează
+minimul). Scriptul iese cu cod 1 dacă un modul nu se poate importa, depășește
+bugetul, încarcă o dependință grea interzisă (ex. APScheduler în dashboard) sau
+creează engine-ul bazei de date la import, deci poate rula în CI ca test de regresie.
+Cu --audit afișează cele mai scumpe importuri (`python -X importtime`).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY = ('apscheduler', 'requests', 'pandas', 'instagrapi', 'google.generativeai')
+
+# modul -> (buget ms, dependințe care nu au voie să fie încărcate la import)
+BUDGETS = {
+    'src.config.settings': (20, HEAVY + ('sqlalchemy', 'flask')),
+    'src.utils.log_query': (40, HEAVY + ('sqlalchemy', 'flask')),
+    'src.models.db': (300, HEAVY + ('flask',)),
+    'src.dashboard.routes': (450, HEAVY),
+    'src.scheduler.tasks': (400, HEAVY + ('flask',)),
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+db = sys.modules.get('src.models.db')
+print(json.dumps({{
+    'ms': elapsed * 1000,
+    'modules': sorted(sys.modules),
+    'engine_created': db is not None and (vars(db).get('_engine') or vars(db).get('engine')) is not None,
+}}))
+"""
+
+
+def probe(module: str) -> Dict:
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    result = subprocess.run([sys.executable, '-c', PROBE.format(module=module)],
+                            capture_output=True, text=True, cwd=ROOT, env=env)
+    if result.returncode != 0:
+        return {'error': result.stderr.strip().splitlines()[-1]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def loaded(modules: List[str], package: str) -> bool:
+    return any(name == package or name.startswith(package + '.') for name in modules)
+
+
+def check(module: str, runs: int) -> Dict:
+    budget, forbidden = BUDGETS[module]
+    samples = [probe(module) for _ in range(runs)]
+    failed = next((sample for sample in samples if 'error' in sample), None)
+    if failed:
+        return {'module': module, 'budget_ms': budget, 'error': failed['error'], 'violations': []}
+
+    best = min(sample['ms'] for sample in samples)
+    violations = []
+    if best > budget:
+        violations.append(f'{best:.0f}ms > {budget}ms budget')
+    heavy = [package for package in forbidden if loaded(samples[0]['modules'], package)]
+    if heavy:
+        violations.append('imports ' + ', '.join(heavy))
+    if samples[0]['engine_created']:
+        violations.append('creates the database engine at import time')
+    return {'module': module, 'budget_ms': budget, 'ms': round(best, 1), 'violations': violations}
+
+
+def audit(module: str, top: int = 15):
+    """Cele mai scumpe importuri (timp cumulat) pentru un modul"""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, cwd=ROOT, env=env)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace(':', '|', 1).split('|'))
+        rows.append((int(cumulative_us), int(self_us), name))
+    print(f"\n{'cumulative ms':>14} | {'self ms':>8} | module ({module})")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>14.1f} | {self_us / 1000:>8.1f} | {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--audit', metavar='MODULE', help='afișează importurile cele mai scumpe')
+    args = parser.parse_args()
+
+    if args.audit:
+        audit(args.audit)
+        return
+
+    failures = 0
+    print(f"{'module':>22} | {'import ms':>9} | {'budget':>6} | result")
+    for module in BUDGETS:
+        result = check(module, args.runs)
+        if 'error' in result:
+            # Un modul care nu se mai importă e tot o regresie
+            failures += 1
+            print(f"{module:>22} | {'-':>9} | {result['budget_ms']:>6} | FAIL: {result['error']}")
+            continue
+        status = 'ok' if not result['violations'] else 'FAIL: ' + '; '.join(result['violations'])
+        failures += bool(result['violations'])
+        print(f"{module:>22} | {result['ms']:>9.1f} | {result['budget_ms']:>6} | {status}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark: extragerea media_id - text complet + re.search vs. streaming pe bytes
+
+Rulare: python -m benchmarks.bench_media_id_extraction [--fixtures DIR]
+
+Fără --fixtures se folosesc pagini sintetice de ~400KB, cu media_id plasat
+la 10%, 50% și 90% din document. Cu --fixtures se măsoară fiecare fișier
+.html salvat din DIR.
+"""
+import argparse
+import re
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, Iterator
+
+from src.services.instagram_service import MEDIA_ID_CHUNK_SIZE, extract_media_id
+
+MEDIA_ID = '3141592653589793238'
+
+
+def build_post_page(size: int, position: float) -> bytes:
+    """Pagină HTML deterministă cu media_id la poziția relativă dată"""
+    filler = ('<div class="x1n2onr6"><span dir="auto">lorem ipsum dolor sit amet ăîșț'
+              '</span></div>\n').encode('utf-8')
+    body = filler * (size // len(filler))
+    offset = int(len(body) * position)
+    offset = body.rfind(b'\n', 0, offset) + 1
+    marker = f'<script type="application/json">{{"media_id":"{MEDIA_ID}"}}</script>\n'.encode()
+    return b'<!DOCTYPE html><html><head></head><body>\n' + body[:offset] + marker + body[offset:] + b'</body></html>'
+
+
+def iter_chunks(page: bytes, chunk_size: int = MEDIA_ID_CHUNK_SIZE) -> Iterator[bytes]:
+    for start in range(0, len(page), chunk_size):
+        yield page[start:start + chunk_size]
+
+
+def full_text(page: bytes):
+    # Echivalentul vechiului response.text + re.search
+    match = re.search(r'"media_id":"(\d+)"', page.decode('utf-8'))
+    return match.group(1) if match else None
+
+
+def streaming(page: bytes):
+    return extract_media_id(iter_chunks(page))
+
+
+def measure(func, page: bytes, repeat: int) -> Dict[str, float]:
+    assert func(page) is not None
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(page)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    func(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'us': elapsed * 1e6, 'peak_kb': peak / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--fixtures', type=Path, help='director cu pagini .html salvate')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    if args.fixtures:
+        pages = {path.name: path.read_bytes() for path in sorted(args.fixtures.glob('*.html'))}
+    else:
+        pages = {f'synthetic@{int(p * 100)}%': build_post_page(400 * 1024, p)
+                 for p in (0.1, 0.5, 0.9)}
+
+    print(f"{'page':>18} | {'size KB':>8} | {'full us':>9} | {'stream us':>9} | "
+          f"{'full peak KB':>12} | {'stream peak KB':>14}")
+    for name, page in pages.items():
+        full = measure(full_text, page, args.repeat)
+        stream = measure(streaming, page, args.repeat)
+        print(f"{name:>18} | {len(page) / 1024:>8.0f} | {full['us']:>9.0f} | {stream['us']:>9.0f} | "
+              f"{full['peak_kb']:>12.0f} | {stream['peak_kb']:>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+"""Micro-benchmark: costul unui can_perform_action în funcție de acțiunile de azi
+
+Rulare: python -m benchmarks.bench_rate_limiter
+"""
+import timeit
+
+from src.utils.rate_limiter import RateLimiter
+
+
+def bench(logged: int, checks: int = 100_000) -> float:
+    limiter = RateLimiter()
+    # Limite mari, ca verificarea să parcurgă tot drumul fără să refuze
+    limiter.limits['like'] = {'max': 10 ** 9, 'per_hour': 10 ** 9}
+    for _ in range(logged):
+        limiter.log_action('like')
+    seconds = timeit.timeit(lambda: limiter.can_perform_action('like'), number=checks)
+    return seconds / checks * 1e9
+
+
+def main():
+    print(f"{'logged today':>14} | {'ns/check':>10}")
+    for logged in (0, 100, 1_000, 10_000, 100_000):
+        print(f"{logged:>14} | {bench(logged):>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark: costul DB per postare, commit per postare vs InteractionWriteBuffer
+
+Rulare: python -m benchmarks.bench_write_buffer [--stored 10000] [--posts 500]
+
+Fiecare variantă primește o bază SQLite temporară cu `stored` conversații deja
+salvate, apoi procesează `posts` postări (jumătate deja văzute, jumătate noi),
+fiecare cu un like și un comentariu. La final se verifică că ambele baze au
+aceleași totaluri.
+"""
+import argparse
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+
+from src.models.db import Base, create_db_engine
+from src.models.conversation import Conversation
+from src.models.interaction import Interaction
+from src.models.write_buffer import InteractionWriteBuffer
+
+
+def seed(db_path: Path, stored: int):
+    ts = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S.%f')
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO conversations VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(i + 1, f'post{i:08d}', None, True, 0, ts, ts) for i in range(stored)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def make_db(tmp: Path, name: str, stored: int):
+    db_path = tmp / f'{name}.db'
+    engine = create_db_engine(f'sqlite:///{db_path}')
+    Base.metadata.create_all(bind=engine)
+    seed(db_path, stored)
+    return engine, sessionmaker(bind=engine)
+
+
+def run_posts(stored: int, posts: int):
+    # Jumătate din postări sunt deja în bază, jumătate sunt noi
+    seen = [f'post{i:08d}' for i in range(0, stored, max(1, stored // (posts // 2)))][:posts // 2]
+    new = [f'new{i:08d}' for i in range(posts - len(seen))]
+    return seen + new
+
+
+def per_post(Session, shortcodes):
+    """Varianta veche: o căutare, insert-uri și un commit pentru fiecare postare"""
+    session = Session()
+    for shortcode in shortcodes:
+        conversation = session.query(Conversation).filter_by(post_shortcode=shortcode).first()
+        if conversation is None:
+            conversation = Conversation(post_shortcode=shortcode, interaction_count=0)
+            session.add(conversation)
+            session.flush()
+        for action_type in ('like', 'comment'):
+            session.add(Interaction(conversation_id=conversation.id, type=action_type,
+                                    direction='outgoing'))
+            conversation.interaction_count += 1
+            conversation.last_interaction = datetime.utcnow()
+        session.commit()
+    session.close()
+
+
+def buffered(Session, shortcodes):
+    buffer = InteractionWriteBuffer(Session, batch_size=10 ** 9)
+    for shortcode in shortcodes:
+        buffer.add_conversation(shortcode)
+        buffer.add_interaction(shortcode, 'like')
+        buffer.add_interaction(shortcode, 'comment', content='Great! ✨')
+    buffer.flush()
+
+
+def totals(Session):
+    session = Session()
+    try:
+        return (
+            session.query(func.count(Conversation.id)).scalar(),
+            session.query(func.sum(Conversation.interaction_count)).scalar(),
+            session.query(func.count(Interaction.id)).scalar(),
+        )
+    finally:
+        session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--stored', type=int, default=10_000)
+    parser.add_argument('--posts', type=int, default=500)
+    args = parser.parse_args()
+
+    shortcodes = run_posts(args.stored, args.posts)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, writer in (('per_post_commit', per_post), ('write_buffer', buffered)):
+            engine, Session = make_db(Path(tmp), name, args.stored)
+            started = time.perf_counter()
+            writer(Session, shortcodes)
+            elapsed = time.perf_counter() - started
+            results[name] = (elapsed, totals(Session))
+            engine.dispose()
+
+    print(f"{args.posts} posts (2 interactions each), {args.stored} conversations already stored")
+    print(f"{'variant':>16} | {'total ms':>9} | {'ms/post':>8} | conversations, interaction_count, interactions")
+    for name, (elapsed, counts) in results.items():
+        print(f"{name:>16} | {elapsed * 1000:>9.1f} | {elapsed * 1000 / len(shortcodes):>8.3f} | {counts}")
+    assert results['per_post_commit'][1] == results['write_buffer'][1], "totals differ"
+
+
+if __name__ == '__main__':
+    main()
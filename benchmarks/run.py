@@ -0,0 +1,292 @@
+"""Suita de benchmark-uri offline: server local în locul Instagram + baze SQLite populate
+
+Rulare: python -m benchmarks.run [--scenario NAME ...] [--ops 200] [--rows 100000]
+                                 [--latency 0.02] [--error-rate 0.0] [--output FILE]
+                                 [--compare PREVIOUS.json]
+
+Fiecare scenariu rulează într-un proces separat (ca peak RSS să fie al lui) și
+raportează throughput, p50/p99 și peak RSS. Rezultatele se salvează ca JSON
+(implicit benchmarks/results/<commit>.json); cu --compare se afișează
+diferențele față de o rulare anterioară.
+"""
+import argparse
+import json
+import multiprocessing
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+SCENARIOS: Dict[str, Callable] = {}
+
+
+def scenario(func: Callable) -> Callable:
+    SCENARIOS[func.__name__] = func
+    return func
+
+
+def write_cookies(tmp: Path) -> Path:
+    path = tmp / 'cookies.json'
+    path.write_text(json.dumps([
+        {'name': name, 'value': f'bench-{name}'}
+        for name in ('sessionid', 'csrftoken', 'ds_user_id')
+    ]))
+    return path
+
+
+def timed_ops(ops: int, func: Callable[[int], object]) -> List[float]:
+    latencies = []
+    for i in range(ops):
+        start = time.perf_counter()
+        func(i)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+@scenario
+def get_media_id(args, tmp: Path) -> Dict:
+    from benchmarks.standin import InstagramStandIn
+    from src.services.instagram_service import InstagramService
+
+    with InstagramStandIn(args.latency, args.jitter, args.error_rate,
+                          fixtures=args.fixtures) as standin:
+        service = InstagramService(str(write_cookies(tmp)), base_url=standin.base_url)
+        latencies = timed_ops(args.ops, lambda i: service.get_media_id(f'bench{i:06d}'))
+    return {'latencies': latencies, 'units': args.ops}
+
+
+@scenario
+def like_post(args, tmp: Path) -> Dict:
+    from benchmarks.standin import InstagramStandIn
+    from src.services.instagram_service import InstagramService
+
+    with InstagramStandIn(args.latency, args.jitter, args.error_rate,
+                          fixtures=args.fixtures) as standin:
+        service = InstagramService(str(write_cookies(tmp)), base_url=standin.base_url)
+        latencies = timed_ops(args.ops, lambda i: service.like_post(f'bench{i:06d}'))
+    return {'latencies': latencies, 'units': args.ops}
+
+
+@scenario
+def process_feed(args, tmp: Path) -> Dict:
+    """Rulări complete ale feed-ului (coadă, rate limiter, scrieri în lot) pe baza populată"""
+    from benchmarks.standin import InstagramStandIn
+    from src.services.instagram_service import InstagramService
+    try:
+        from src.scheduler.tasks import TaskManager
+    except ImportError as e:
+        return {'skipped': f'cannot import TaskManager: {e}'}
+
+    class BenchFeed:
+        """Feed determinist: `posts` postări noi per rulare, fiecare cu like + comentariu"""
+
+        def __init__(self, posts: int):
+            self.posts = posts
+            self.run = 0
+
+        def process_feed(self, session):
+            self.run += 1
+            return [{
+                'status': 'new',
+                'post': {'shortcode': f'feed{self.run:03d}x{i:05d}', 'caption': 'bench'},
+                'action': {'action': 'both', 'response': 'Great! ✨'},
+            } for i in range(self.posts)]
+
+    runs = max(1, args.ops // 50)
+    with InstagramStandIn(args.latency, args.jitter, args.error_rate,
+                          fixtures=args.fixtures) as standin:
+        manager = TaskManager(str(write_cookies(tmp)), 'bench-key')
+        instagram = InstagramService(manager.cookie_file, base_url=standin.base_url)
+        # Fără pauze și fără limite zilnice: se măsoară costul drumului, nu rate limiting-ul
+        manager.services._services = (instagram, None, BenchFeed(50))
+        manager.rate_limiter.get_delay = lambda action_type: 0.0
+        for limits in manager.rate_limiter.limits.values():
+            limits.update(max=10 ** 9, per_hour=10 ** 9)
+
+        latencies = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            manager.process_feed()
+            manager.action_queue.join()
+            latencies.append(time.perf_counter() - start)
+        manager.stop()
+    return {'latencies': latencies, 'units': runs * 50}
+
+
+@scenario
+def calculate_stats(args, tmp: Path) -> Dict:
+    from src.dashboard.routes import calculate_stats as calculate
+    from src.models.db import SessionLocal
+
+    session = SessionLocal()
+    try:
+        calculate(session)  # încălzire cache
+        latencies = timed_ops(args.ops, lambda i: calculate(session))
+    finally:
+        session.close()
+    return {'latencies': latencies, 'units': args.ops}
+
+
+@scenario
+def rate_limiter(args, tmp: Path) -> Dict:
+    from src.utils.rate_limiter import RateLimiter
+    from src.utils.rate_limit_store import SQLiteRateLimitStore
+
+    limiter = RateLimiter(store=SQLiteRateLimitStore(tmp / 'rate_limits.db'))
+    limiter.limits['like'] = {'max': 10 ** 9, 'per_hour': 10 ** 9}
+    for _ in range(min(args.rows, 10_000)):
+        limiter.log_action('like')
+    checks = args.ops * 50
+    latencies = timed_ops(checks, lambda i: limiter.can_perform_action('like'))
+    return {'latencies': latencies, 'units': checks}
+
+
+@scenario
+def save_metrics(args, tmp: Path) -> Dict:
+    from src.utils.metrics import MetricsTracker
+
+    metrics = MetricsTracker(str(tmp / 'metrics.json'), batch_size=10 ** 9)
+
+    def flush(i):
+        for j in range(100):
+            metrics.track_action('like', j % 10 != 0, {'error': 'timeout'} if j % 10 == 0 else {})
+        metrics.save_metrics(block=True)
+
+    latencies = timed_ops(args.ops, flush)
+    return {'latencies': latencies, 'units': args.ops * 100}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    from src.utils.log_query import percentile as nearest_rank
+    return nearest_rank(sorted_values, pct) if sorted_values else 0.0
+
+
+def run_child(name: str, args, results):
+    """Rulează un scenariu în procesul copil și trimite rezumatul înapoi"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        # Configurarea trebuie făcută înainte ca modulele să creeze engine-ul
+        from src.config.settings import Config
+        db_path = tmp / 'bench.db'
+        Config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        Config.JOBS_DATABASE_URI = f'sqlite:///{tmp / "jobs.db"}'
+        Config.RATE_LIMIT_DB = tmp / 'rate_limits_manager.db'
+        Config.FEED_CURSOR_FILE = tmp / 'feed_cursor.json'
+        Config.SEEN_INDEX_FILE = tmp / 'seen_shortcodes.idx'
+        Config.ARCHIVE_DIR = tmp / 'archive'
+
+        from src.models.db import Base, get_engine
+        import src.models.conversation, src.models.interaction, src.models.rollup, src.models.media_id, src.models.activity  # noqa: F401
+        Base.metadata.create_all(bind=get_engine())
+        if args.rows:
+            from benchmarks.bench_db_indexes import seed
+            seed(db_path, args.rows)
+
+        started = time.perf_counter()
+        try:
+            outcome = SCENARIOS[name](args, tmp)
+        except Exception as e:
+            outcome = {'error': f'{type(e).__name__}: {e}'}
+        wall = time.perf_counter() - started
+
+    if 'latencies' not in outcome:
+        results.put(outcome)
+        return
+    latencies = sorted(outcome['latencies'])
+    results.put({
+        'ops': len(latencies),
+        'units': outcome['units'],
+        'wall_seconds': round(wall, 4),
+        'throughput_per_second': round(outcome['units'] / wall, 2) if wall else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 4),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 4),
+        # ru_maxrss e în KB pe Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    })
+
+
+def run_scenario(name: str, args) -> Dict:
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=run_child, args=(name, args, results))
+    process.start()
+    process.join()
+    if process.exitcode != 0 or results.empty():
+        return {'error': f'scenario exited with code {process.exitcode}'}
+    return results.get()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(current: Dict, previous_path: Path):
+    previous = json.loads(previous_path.read_text())
+    print(f"\ncompared with {previous.get('commit')} ({previous_path}):")
+    print(f"{'scenario':>16} | {'throughput':>11} | {'p50':>9} | {'p99':>9} | {'peak RSS':>9}")
+    for name, result in current['scenarios'].items():
+        old = previous.get('scenarios', {}).get(name)
+        if not old or 'p50_ms' not in old or 'p50_ms' not in result:
+            continue
+
+        def change(key):
+            return f"{(result[key] - old[key]) / old[key] * 100:+.1f}%" if old[key] else 'n/a'
+
+        print(f"{name:>16} | {change('throughput_per_second'):>11} | {change('p50_ms'):>9} | "
+              f"{change('p99_ms'):>9} | {change('peak_rss_mb'):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='poate fi repetat; implicit toate')
+    parser.add_argument('--ops', type=int, default=200)
+    parser.add_argument('--rows', type=int, default=100_000, help='conversații în baza populată')
+    parser.add_argument('--latency', type=float, default=0.0, help='latența serverului local (s)')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--fixtures', type=Path, help='pagini .html înregistrate')
+    parser.add_argument('--output', type=Path)
+    parser.add_argument('--compare', type=Path, help='rezultatele unei rulări anterioare')
+    args = parser.parse_args()
+
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': sys.version.split()[0],
+        'params': {key: str(value) if isinstance(value, Path) else value
+                   for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'scenarios': {},
+    }
+
+    print(f"{'scenario':>16} | {'ops/s':>10} | {'p50 ms':>9} | {'p99 ms':>9} | {'RSS MB':>7}")
+    for name in args.scenario or SCENARIOS:
+        result = run_scenario(name, args)
+        report['scenarios'][name] = result
+        if 'p50_ms' in result:
+            print(f"{name:>16} | {result['throughput_per_second']:>10.1f} | {result['p50_ms']:>9.3f} | "
+                  f"{result['p99_ms']:>9.3f} | {result['peak_rss_mb']:>7.1f}")
+        else:
+            print(f"{name:>16} | {result.get('skipped') or result.get('error')}")
+
+    output = args.output or RESULTS_DIR / f'{commit}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nresults written to {output}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""Server HTTP local care imită endpoint-urile Instagram folosite de bot
+
+Servește pagini de postare (din --fixtures sau sintetice, cu media_id) și
+răspunsurile JSON pentru like/comment, cu latență și rată de erori
+configurabile. Se folosește din benchmarks.run sau separat:
+
+Rulare: python -m benchmarks.standin [--port 8765] [--latency 0.05] [--error-rate 0.02]
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.bench_media_id_extraction import build_post_page
+
+POST_PATH = re.compile(r'^/p/([^/]+)/?$')
+LIKE_PATH = re.compile(r'^/web/likes/(\d+)/like/?$')
+COMMENT_PATH = re.compile(r'^/web/comments/(\d+)/add/?$')
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Conexiunile închise de client (după media_id găsit) nu sunt erori
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+def media_id_for(shortcode: str) -> str:
+    # Determinist, ca rezultatele să fie comparabile între rulări
+    return str(3_000_000_000_000_000_000 + zlib.crc32(shortcode.encode()))
+
+
+class InstagramStandIn:
+    """ThreadingHTTPServer pe 127.0.0.1 cu latență (+jitter) și erori injectate"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 500, page_size: int = 400 * 1024,
+                 fixtures: Optional[Path] = None, port: int = 0, seed: int = 42):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.page_size = page_size
+        self.fixtures: List[bytes] = (
+            [path.read_bytes() for path in sorted(Path(fixtures).glob('*.html'))] if fixtures else []
+        )
+        self.rng = random.Random(seed)
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server = QuietHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'InstagramStandIn':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def page_for(self, shortcode: str) -> bytes:
+        if self.fixtures:
+            # Paginile înregistrate au propriul media_id; se alege una după shortcode
+            return self.fixtures[zlib.crc32(shortcode.encode()) % len(self.fixtures)]
+        position = (zlib.crc32(shortcode.encode()) % 90 + 5) / 100
+        page = build_post_page(self.page_size, position)
+        return page.replace(b'3141592653589793238', media_id_for(shortcode).encode())
+
+    def _delay_and_fail(self) -> bool:
+        with self._lock:
+            delay = self.latency + (self.rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+            failed = self.rng.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        return failed
+
+    def _count(self, route: str):
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                if status == 429:
+                    self.send_header('Retry-After', '1')
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Clientul închide conexiunea după ce găsește media_id
+                    self.close_connection = True
+
+            def _json(self, status: int, data: Dict):
+                self._send(status, json.dumps(data).encode(), 'application/json')
+
+            def do_GET(self):
+                match = POST_PATH.match(self.path)
+                if not match:
+                    return self._json(404, {'status': 'fail'})
+                standin._count('post_page')
+                if standin._delay_and_fail():
+                    return self._json(standin.error_status, {'status': 'fail'})
+                self._send(200, standin.page_for(match.group(1)), 'text/html; charset=utf-8')
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                self.rfile.read(length)
+                if LIKE_PATH.match(self.path):
+                    standin._count('like')
+                    body = {'status': 'ok'}
+                elif COMMENT_PATH.match(self.path):
+                    standin._count('comment')
+                    body = {'id': str(int(time.time() * 1000)), 'status': 'ok'}
+                else:
+                    return self._json(404, {'status': 'fail'})
+                if standin._delay_and_fail():
+                    return self._json(standin.error_status, {'status': 'fail'})
+                self._json(200, body)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=500)
+    parser.add_argument('--fixtures', type=Path, help='director cu pagini .html înregistrate')
+    args = parser.parse_args()
+
+    standin = InstagramStandIn(args.latency, args.jitter, args.error_rate, args.error_status,
+                               fixtures=args.fixtures, port=args.port)
+    print(f"Serving on {standin.base_url} (INSTAGRAM_BASE_URL={standin.base_url})")
+    try:
+        standin._server.serve_forever()
+    except KeyboardInterrupt:
+        standin.stop()
+
+
+if __name__ == '__main__':
+    main()
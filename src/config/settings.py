@@ -9,11 +9,22 @@ class Config:
     
     # Instagram settings
     INSTAGRAM_APP_ID = "936619743392459"
+    # Suprascris de benchmark-uri cu serverul local care imită Instagram
+    INSTAGRAM_BASE_URL = os.environ.get("INSTAGRAM_BASE_URL", "https://www.instagram.com")
     COOKIES_FILE = "instagram_cookies.json"
+    HTTP_POOL_SIZE = 10
     
     # Database settings
     SQLALCHEMY_DATABASE_URI = "sqlite:///" + str(DATA_DIR / "instagram_bot.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024  # 256MB
+    JOBS_DATABASE_URI = "sqlite:///" + str(DATA_DIR / "jobs.db")
+
+    # Feed job
+    FEED_INTERVAL_MINUTES = 5
+    FEED_MISFIRE_GRACE_SECONDS = 60
+    FEED_CURSOR_FILE = DATA_DIR / "feed_cursor.json"
+    SEEN_INDEX_FILE = DATA_DIR / "seen_shortcodes.idx"
     
     # Rate limiting
     MAX_ACTIONS_PER_DAY = {
@@ -23,6 +34,8 @@ class Config:
         "unfollow": 200
     }
     
+    RATE_LIMIT_DB = DATA_DIR / "rate_limits.db"
+
     # Time delays (in seconds)
     MIN_DELAY_BETWEEN_ACTIONS = 3
     MAX_DELAY_BETWEEN_ACTIONS = 10
@@ -31,10 +44,34 @@ class Config:
     MAX_INTERACTIONS_PER_CONVERSATION = 5
     CONVERSATION_TIMEOUT_HOURS = 24
 
+    # Arhivare: conversațiile inactive mai vechi de atât ies din tabelele active
+    ARCHIVE_DIR = DATA_DIR / "archive"
+    ARCHIVE_AFTER_DAYS = 30
+    ARCHIVE_INTERVAL_MINUTES = 60
+
     # Dashboard settings
     DASHBOARD_UPDATE_INTERVAL = 30  # seconds
     DASHBOARD_HISTORY_DAYS = 7
-    
-    # Create required directories
-    LOGS_DIR.mkdir(exist_ok=True)
-    DATA_DIR.mkdir(exist_ok=True)
\ No newline at end of file
+
+    # Profilare la cerere; rutele dashboard-ului sunt dezactivate fără token
+    PROFILER_TOKEN = os.environ.get("PROFILER_TOKEN")
+    PROFILES_DIR = LOGS_DIR / "profiles"
+    PROFILER_INTERVAL_MS = 10
+    PROFILER_MAX_SECONDS = 300
+    PROFILE_RETENTION_FILES = 20
+    # Snapshot tracemalloc per job (încetinește job-urile cât e activ)
+    JOB_TRACEMALLOC = os.environ.get("JOB_TRACEMALLOC") == "1"
+    TRACEMALLOC_FRAMES = 10
+
+    # Metric rollups: câte zile se păstrează fiecare rezoluție
+    ROLLUP_RETENTION_DAYS = {
+        "minute": 1,
+        "hour": DASHBOARD_HISTORY_DAYS,
+        "day": 365
+    }
+
+    @classmethod
+    def init_dirs(cls):
+        """Creează directoarele de date și loguri (apelat explicit, nu la import)"""
+        cls.LOGS_DIR.mkdir(parents=True, exist_ok=True)
+        cls.DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,85 @@
+import json
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class EventBroadcaster:
+    """Fan-out unic pentru Server-Sent Events
+
+    Fiecare eveniment e serializat o singură dată la publicare și păstrat într-un
+    inel numerotat; clienții conectați doar așteaptă pe condiție și trimit
+    bucățile deja formatate. Un client rămas prea mult în urmă (sau care se
+    reconectează cu un Last-Event-ID ieșit din inel) primește un snapshot nou.
+    """
+
+    def __init__(self, max_events: int = 1000, heartbeat: float = 15.0):
+        self.heartbeat = heartbeat
+        self._events: deque = deque(maxlen=max_events)
+        self._seq = 0
+        self._subscribers = 0
+        self._cond = threading.Condition()
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    @property
+    def subscribers(self) -> int:
+        """Clienții conectați acum la stream"""
+        return self._subscribers
+
+    def publish(self, event_type: str, data: Dict):
+        payload = json.dumps(data, default=str)
+        with self._cond:
+            self._seq += 1
+            self._events.append((self._seq, format_event(event_type, payload, self._seq)))
+            self._cond.notify_all()
+
+    def events_after(self, seq: int, timeout: float) -> Optional[List[Tuple[int, str]]]:
+        """Evenimentele mai noi de `seq`; None dacă o parte au ieșit deja din inel"""
+        with self._cond:
+            if self._seq <= seq:
+                self._cond.wait(timeout)
+            if self._seq <= seq:
+                return []
+            if not self._events or self._events[0][0] > seq + 1:
+                return None
+            return [event for event in self._events if event[0] > seq]
+
+    def stream(self, snapshot: Callable[[], Dict], last_event_id: str = None) -> Iterator[str]:
+        """Generatorul unui client: snapshot (dacă e nevoie), apoi doar delta-uri"""
+        try:
+            seq = int(last_event_id)
+        except (TypeError, ValueError):
+            seq = None
+
+        with self._cond:
+            self._subscribers += 1
+        try:
+            yield from self._client_events(snapshot, seq)
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+
+    def _client_events(self, snapshot: Callable[[], Dict], seq: Optional[int]) -> Iterator[str]:
+        while True:
+            if seq is None:
+                # Numărul de secvență se citește înainte de snapshot, ca nimic să nu se piardă
+                seq = self._seq
+                yield format_event('snapshot', json.dumps(snapshot(), default=str), seq)
+
+            events = self.events_after(seq, self.heartbeat)
+            if events is None:
+                seq = None
+                continue
+            if not events:
+                # Comentariu SSE: ține conexiunea deschisă și detectează clienții plecați
+                yield ': keepalive\n\n'
+                continue
+            for seq, chunk in events:
+                yield chunk
+
+
+def format_event(event_type: str, payload: str, seq: int) -> str:
+    return f"id: {seq}\nevent: {event_type}\ndata: {payload}\n\n"
@@ -1,23 +1,227 @@
-from flask import Blueprint, jsonify, render_template
+import hmac
+import logging
+import threading
+import time
+from functools import wraps
+from flask import Blueprint, Response, jsonify, render_template, request, stream_with_context
+from sqlalchemy import event, func
+from sqlalchemy.engine import Engine
+from ..config.settings import Config
 from ..models.db import SessionLocal
 from ..models.conversation import Conversation
+from ..models.interaction import Interaction
 from ..utils.metrics import MetricsTracker
+from ..utils.rollups import RollupAggregator
+from ..utils.histogram import REGISTRY
+from ..utils.activity_feed import ActivityFeed
+from ..utils.profiler import SamplingProfiler
+from .stats_cache import StatsCache
+from .broadcaster import EventBroadcaster
 from datetime import datetime, timedelta
 
+logger = logging.getLogger(__name__)
+
 dashboard = Blueprint('dashboard', __name__)
-metrics = MetricsTracker()
+rollups = RollupAggregator(SessionLocal)
+stats_cache = StatsCache(ttl=Config.DASHBOARD_UPDATE_INTERVAL)
+# Jurnalul acțiunilor; se transmite și TaskManager-ului când rulează în același proces
+activity = ActivityFeed(SessionLocal)
+# Un singur fan-out pentru toți clienții conectați la /api/dashboard/stream
+broadcaster = EventBroadcaster()
+# Profilerul procesului dashboard-ului (și al scheduler-ului, dacă rulează împreună)
+profiler = SamplingProfiler()
+
+def invalidate_on_write(conn, clauseelement, multiparams, params, execution_options, result):
+    # Eveniment Core: prinde și insert-urile/update-urile în lot ale write buffer-ului,
+    # pe care hook-urile ORM (after_insert/after_update) nu le văd
+    if getattr(clauseelement, 'is_dml', False):
+        table = getattr(clauseelement, 'table', None)
+        if table is Conversation.__table__ or table is Interaction.__table__:
+            stats_cache.invalidate()
+
+# Interacțiunile noi invalidează snapshot-ul comun
+activity.add_listener(stats_cache.invalidate)
+event.listen(Engine, 'after_execute', invalidate_on_write)
+
+_metrics = None
+_metrics_lock = threading.Lock()
+_publisher = None
+_publisher_lock = threading.Lock()
+
+def init_metrics(tracker: MetricsTracker):
+    """Folosește tracker-ul dat (ex. același cu al TaskManager-ului când rulează în proces)"""
+    with _metrics_lock:
+        _use_metrics(tracker)
+
+def get_metrics() -> MetricsTracker:
+    # Creat la prima cerere: citește metrics.json și înregistrează hook-ul atexit
+    if _metrics is not None:
+        return _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _use_metrics(MetricsTracker(rollups=rollups))
+        return _metrics
+
+def _use_metrics(tracker: MetricsTracker):
+    global _metrics
+    _metrics = tracker
+    tracker.add_listener(stats_cache.invalidate)
+    tracker.add_listener(publish_counters)
+
+def publish_counters(action_type, action_data):
+    """Delta pentru clienții SSE: contoarele curente, calculate din memorie"""
+    broadcaster.publish('counters', get_counters())
+
+def publish_activity(row):
+    # Rândul nou din jurnalul de activitate, așa cum apare în tabel
+    broadcaster.publish('activity', row)
+
+def publish_db_stats():
+    stats = stats_cache.get(compute_stats)
+    broadcaster.publish('stats', {
+        "active_conversations": stats["active_conversations"],
+        "activity_data": stats["activity_data"]
+    })
+
+def ensure_publisher():
+    # Partea calculată din DB se actualizează o dată pe interval, nu per cerere
+    global _publisher
+    with _publisher_lock:
+        if _publisher is not None:
+            return
+        _publisher = threading.Thread(target=run_publisher, name='dashboard-publisher',
+                                      daemon=True)
+        _publisher.start()
+
+def run_publisher():
+    """Periodic: activitatea altor procese intră în coadă; clienții SSE primesc delta-urile"""
+    while True:
+        time.sleep(Config.DASHBOARD_UPDATE_INTERVAL)
+        try:
+            # Rândurile scrise de alte procese (ex. scheduler-ul separat), citite din DB
+            rows = activity.sync()
+            if rows:
+                stats_cache.invalidate()
+            if not broadcaster.subscribers:
+                continue
+            for row in reversed(rows):
+                publish_activity(row)
+            publish_db_stats()
+        except Exception as e:
+            logger.error(f"Error publishing dashboard updates: {str(e)}")
+
+activity.add_listener(publish_activity)
 
 @dashboard.route('/')
 def index():
-    return render_template('dashboard/index.html')
+    return render_template('dashboard/index.html', update_interval=Config.DASHBOARD_UPDATE_INTERVAL)
 
 @dashboard.route('/api/dashboard/stats')
 def get_stats():
+    # Toți clienții primesc același snapshot, calculat o dată pe interval
+    ensure_publisher()
+    return jsonify(stats_cache.get(compute_stats))
+
+@dashboard.route('/api/dashboard/stream')
+def stream():
+    # Snapshot-ul complet o dată, apoi doar delta-uri (Server-Sent Events)
+    get_metrics()
+    ensure_publisher()
+    events = broadcaster.stream(lambda: stats_cache.get(compute_stats),
+                                request.headers.get('Last-Event-ID'))
+    return Response(stream_with_context(events), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@dashboard.route('/api/dashboard/activity')
+def get_activity():
+    # Paginare keyset: ?before=<id>&limit=; prima pagină vine din memorie
+    ensure_publisher()
+    before = request.args.get('before', type=int)
+    limit = max(1, min(request.args.get('limit', activity.tail_size, type=int), 200))
+    if before is None and limit <= activity.tail_size:
+        items = activity.recent(limit)
+        return jsonify({
+            "items": items,
+            "next_before": items[-1]["id"] if len(items) == limit else None
+        })
+    return jsonify(activity.page(before, limit))
+
+@dashboard.route('/api/dashboard/history')
+def get_history():
+    # Grafice pe 7/30 zile din bucket-urile pre-agregate
+    days = request.args.get('days', Config.DASHBOARD_HISTORY_DAYS, type=int)
+    days = max(1, min(days, Config.ROLLUP_RETENTION_DAYS['day']))
+    session = SessionLocal()
+    try:
+        return jsonify({
+            "days": days,
+            "series": rollups.get_history(session, days, request.args.get('action'))
+        })
+    finally:
+        session.close()
+
+def profiler_token_required(view):
+    """Rutele de profilare cer header-ul X-Profiler-Token; fără token configurat nu există"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not Config.PROFILER_TOKEN:
+            return jsonify({"error": "not found"}), 404
+        token = request.headers.get('X-Profiler-Token', '')
+        if not hmac.compare_digest(token.encode(), Config.PROFILER_TOKEN.encode()):
+            return jsonify({"error": "forbidden"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+@dashboard.route('/api/dashboard/profiler', methods=['GET'])
+@profiler_token_required
+def profiler_status():
+    return jsonify(profiler.status())
+
+@dashboard.route('/api/dashboard/profiler/start', methods=['POST'])
+@profiler_token_required
+def profiler_start():
+    # ?interval_ms=&seconds=; se oprește singur după PROFILER_MAX_SECONDS
+    interval_ms = request.args.get('interval_ms', type=float)
+    interval = max(1.0, interval_ms) / 1000 if interval_ms else None
+    if not profiler.start(interval, request.args.get('seconds', type=int)):
+        return jsonify({"error": "profiler already running", **profiler.status()}), 409
+    return jsonify(profiler.status())
+
+@dashboard.route('/api/dashboard/profiler/stop', methods=['POST'])
+@profiler_token_required
+def profiler_stop():
+    capture = profiler.stop()
+    if capture is None:
+        return jsonify({"error": "profiler not running", **profiler.status()}), 409
+    return jsonify({"capture": capture.name, **profiler.status()})
+
+@dashboard.route('/metrics')
+def prometheus_metrics():
+    # Histogramele de latență + contoarele din MetricsTracker, format text Prometheus
+    lines = [
+        "# HELP instagram_bot_actions_total Tracked actions by type and result",
+        "# TYPE instagram_bot_actions_total counter",
+    ]
+    for action_type, counters in sorted(get_metrics().get_totals().items()):
+        for result, count in sorted(counters.items()):
+            lines.append(f'instagram_bot_actions_total{{action="{action_type}",result="{result}"}} {count}')
+    lines += [
+        "# HELP instagram_bot_events_total Internal event counters (cache hits, misses, ...)",
+        "# TYPE instagram_bot_events_total counter",
+    ]
+    for name, count in sorted(get_metrics().get_counters().items()):
+        lines.append(f'instagram_bot_events_total{{name="{name}"}} {count}')
+
+    body = REGISTRY.render() + '\n'.join(lines) + '\n'
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+def compute_stats():
     session = SessionLocal()
     try:
         # Calculează statisticile
-        stats = calculate_stats(session)
-        return jsonify(stats)
+        return calculate_stats(session)
     finally:
         session.close()
 
@@ -25,55 +229,61 @@ def calculate_stats(session):
     now = datetime.utcnow()
     today = now.replace(hour=0, minute=0, second=0, microsecond=0)
     
-    # Statistici de bază
-    daily_stats = metrics.get_daily_stats()
-    
     # Conversații active
     active_conversations = session.query(Conversation).filter(
         Conversation.is_active == True,
         Conversation.last_interaction >= today
     ).count()
     
-    # Rate de succes/eroare
-    success_rate = metrics.get_success_rate()
-    error_rate = 100 - success_rate if success_rate > 0 else 0
-    
     # Date pentru graficul de activitate
     activity_data = get_activity_data(session, now)
     
-    # Date pentru graficul de erori
-    error_data = get_error_distribution()
-    
     # Activitate recentă
-    recent_activity = get_recent_activity(session)
+    recent_activity = get_recent_activity()
     
     return {
-        "total_interactions": sum(daily_stats.values()),
-        "success_rate": round(success_rate, 2),
-        "error_rate": round(error_rate, 2),
+        **get_counters(),
         "active_conversations": active_conversations,
         "activity_data": activity_data,
-        "error_data": error_data,
         "recent_activity": recent_activity
     }
 
+def get_counters():
+    # Statisticile din memorie (fără DB), trimise și ca delta pe stream
+    metrics = get_metrics()
+    daily_stats = metrics.get_daily_stats()
+    success_rate = metrics.get_success_rate()
+    error_rate = 100 - success_rate if success_rate > 0 else 0
+    return {
+        "total_interactions": daily_stats['successful_requests'] + daily_stats['failed_requests'],
+        "success_rate": round(success_rate, 2),
+        "error_rate": round(error_rate, 2),
+        "error_data": get_error_distribution()
+    }
+
 def get_activity_data(session, now):
-    # Ultimele 24 ore de activitate
+    # Ultimele 24 ore de activitate, grupate pe oră într-o singură interogare
+    start = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=23)
+    bucket = func.strftime('%Y-%m-%d %H', Conversation.last_interaction)
+    counts = dict(
+        session.query(bucket, func.count(Conversation.id))
+        .filter(Conversation.last_interaction >= start)
+        .group_by(bucket)
+        .all()
+    )
+
     data = []
     for i in range(24):
-        time = now - timedelta(hours=i)
-        interactions = session.query(Conversation).filter(
-            Conversation.last_interaction >= time,
-            Conversation.last_interaction < time + timedelta(hours=1)
-        ).count()
+        time = start + timedelta(hours=i)
         data.append({
             "hour": time.strftime("%H:00"),
-            "interactions": interactions
+            "interactions": counts.get(time.strftime('%Y-%m-%d %H'), 0)
         })
-    return data[::-1]  # Inversează pentru ordine cronologică
+    return data
 
 def get_error_distribution():
     # Distribuția erorilor pe categorii
+    metrics = get_metrics()
     return {
         "rate_limit": metrics.daily_stats.get("rate_limit_errors", 0),
         "network": metrics.daily_stats.get("network_errors", 0),
@@ -81,15 +291,6 @@ def get_error_distribution():
         "other": metrics.daily_stats.get("other_errors", 0)
     }
 
-def get_recent_activity(session):
-    # Ultimele 50 de interacțiuni
-    recent = session.query(Conversation).order_by(
-        Conversation.last_interaction.desc()
-    ).limit(50).all()
-    
-    return [{
-        "time": conv.last_interaction.strftime("%H:%M:%S"),
-        "action": conv.last_action,
-        "status": "success" if conv.is_active else "error",
-        "details": f"Post: {conv.post_shortcode}"
-    } for conv in recent]
\ No newline at end of file
+def get_recent_activity():
+    # Ultimele 50 de acțiuni, din coada în memorie a jurnalului de activitate
+    return activity.recent()
@@ -0,0 +1,39 @@
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class StatsCache:
+    """Snapshot comun al statisticilor, recalculat cel mult o dată pe interval"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot: Optional[Dict] = None
+        self._expires_at = 0.0
+        self._generation = 0
+
+    def get(self, compute: Callable[[], Dict]) -> Dict:
+        """Returnează snapshot-ul curent sau îl recalculează dacă a expirat"""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._expires_at:
+            return snapshot
+
+        # Un singur client recalculează, ceilalți așteaptă rezultatul
+        with self._lock:
+            if self._snapshot is not None and time.monotonic() < self._expires_at:
+                return self._snapshot
+
+            generation = self._generation
+            snapshot = compute()
+
+            # Nu păstra un snapshot invalidat în timpul calculului
+            if generation == self._generation:
+                self._snapshot = snapshot
+                self._expires_at = time.monotonic() + self.ttl
+            return snapshot
+
+    def invalidate(self, *args, **kwargs):
+        """Marchează snapshot-ul ca expirat (ex. la o interacțiune nouă)"""
+        self._generation += 1
+        self._expires_at = 0.0
@@ -0,0 +1,15 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float
+from .db import Base
+
+class ActivityLog(Base):
+    __tablename__ = 'activity_log'
+
+    # Doar adăugări: un rând per acțiune executată, paginat după id (keyset)
+    id = Column(Integer, primary_key=True)
+    action_type = Column(String(20), nullable=False)
+    status = Column(String(10), nullable=False)  # success, error
+    post_shortcode = Column(String(100), nullable=True)
+    latency_ms = Column(Float, nullable=True)
+    details = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,158 @@
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict
+
+from sqlalchemy import MetaData, and_, or_, update
+
+from ..config.settings import Config
+from .conversation import Conversation
+from .interaction import Interaction
+from .db import get_engine
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationArchiver:
+    """Închide conversațiile expirate și mută conversațiile vechi în arhive lunare
+
+    Conversațiile inactive mai vechi de `archive_after_days` (după
+    last_interaction), împreună cu interacțiunile lor, sunt mutate în
+    `archive_dir/conversations_YYYY-MM.db` (atașată prin ATTACH), în loturi:
+    copia în arhivă și ștergerea din main sunt tranzacții separate, deci un
+    lot întrerupt se reia fără pierderi sau duplicate. Tabelele active rămân
+    limitate la fereastra activă; rollup-urile din metric_rollups nu sunt atinse.
+    """
+
+    def __init__(self, engine=None, archive_dir: Path = None, archive_after_days: int = None,
+                 timeout_hours: int = None, max_interactions: int = None,
+                 batch_size: int = 5000):
+        self._engine = engine
+        self.archive_dir = Path(archive_dir or Config.ARCHIVE_DIR)
+        self.archive_after_days = archive_after_days or Config.ARCHIVE_AFTER_DAYS
+        self.timeout_hours = timeout_hours or Config.CONVERSATION_TIMEOUT_HOURS
+        self.max_interactions = max_interactions or Config.MAX_INTERACTIONS_PER_CONVERSATION
+        self.batch_size = batch_size
+
+    @property
+    def engine(self):
+        return self._engine or get_engine()
+
+    def expire_conversations(self, now: datetime = None) -> int:
+        """Marchează inactive, cu un singur UPDATE, conversațiile expirate sau epuizate"""
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(hours=self.timeout_hours)
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                update(Conversation.__table__)
+                .where(and_(
+                    Conversation.is_active == True,
+                    or_(Conversation.last_interaction < cutoff,
+                        Conversation.interaction_count >= self.max_interactions)
+                ))
+                .values(is_active=False)
+            )
+        return result.rowcount
+
+    def archive_conversations(self, now: datetime = None) -> Dict[str, int]:
+        """Mută conversațiile vechi în arhivele lunare; întoarce numărul mutat per lună"""
+        now = now or datetime.utcnow()
+        cutoff = (now - timedelta(days=self.archive_after_days)).isoformat(' ')
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+
+        moved: Dict[str, int] = {}
+        with self.engine.connect() as conn:
+            months = [row[0] for row in conn.exec_driver_sql(
+                "SELECT DISTINCT strftime('%Y-%m', last_interaction) FROM conversations "
+                "WHERE is_active = 0 AND last_interaction < ?", (cutoff,)
+            )]
+            conn.rollback()
+            for month in months:
+                moved[month] = self._archive_month(conn, month, cutoff)
+        return moved
+
+    def _create_archive_tables(self, conn):
+        """Tabelele arhivei cu schema reală (PK, UNIQUE), ca re-copierea să fie idempotentă"""
+        metadata = MetaData()
+        tables = [table.to_metadata(metadata, schema='archive')
+                  for table in (Conversation.__table__, Interaction.__table__)]
+        for table in tables:
+            columns = conn.exec_driver_sql(f"PRAGMA archive.table_info({table.name})").all()
+            if columns and not any(column[5] for column in columns):
+                # Arhivă veche, creată fără PRIMARY KEY: se reconstruiește o singură dată
+                conn.exec_driver_sql(f"ALTER TABLE archive.{table.name} RENAME TO {table.name}_old")
+                table.create(conn)
+                conn.exec_driver_sql(
+                    f"INSERT OR IGNORE INTO archive.{table.name} SELECT * FROM archive.{table.name}_old"
+                )
+                conn.exec_driver_sql(f"DROP TABLE archive.{table.name}_old")
+            else:
+                table.create(conn, checkfirst=True)
+        conn.commit()
+
+    def _archive_month(self, conn, month: str, cutoff: str) -> int:
+        archive_path = self.archive_dir / f"conversations_{month}.db"
+        # ATTACH/DETACH nu pot rula într-o tranzacție deschisă
+        conn.exec_driver_sql("ATTACH DATABASE ? AS archive", (str(archive_path),))
+        try:
+            self._create_archive_tables(conn)
+
+            total = 0
+            while True:
+                conn.exec_driver_sql("DROP TABLE IF EXISTS temp.archive_batch")
+                conn.exec_driver_sql(
+                    "CREATE TEMP TABLE archive_batch AS SELECT id FROM main.conversations "
+                    "WHERE is_active = 0 AND last_interaction < ? "
+                    "AND strftime('%Y-%m', last_interaction) = ? LIMIT ?",
+                    (cutoff, month, self.batch_size)
+                )
+                count = conn.exec_driver_sql("SELECT count(*) FROM temp.archive_batch").scalar()
+                conn.commit()
+                if not count:
+                    break
+                # În WAL, o tranzacție pe mai multe fișiere nu e atomică: întâi se
+                # confirmă copia în arhivă, apoi se șterge din main în altă tranzacție.
+                # După o întrerupere, lotul se copiază din nou (OR IGNORE) și se șterge.
+                conn.exec_driver_sql(
+                    "INSERT OR IGNORE INTO archive.conversations SELECT * FROM main.conversations "
+                    "WHERE id IN (SELECT id FROM temp.archive_batch)"
+                )
+                conn.exec_driver_sql(
+                    "INSERT OR IGNORE INTO archive.interactions SELECT * FROM main.interactions "
+                    "WHERE conversation_id IN (SELECT id FROM temp.archive_batch)"
+                )
+                conn.commit()
+                # Se șterge doar ce există deja în arhivă
+                conn.exec_driver_sql(
+                    "DELETE FROM main.interactions "
+                    "WHERE conversation_id IN (SELECT id FROM temp.archive_batch) "
+                    "AND id IN (SELECT id FROM archive.interactions)"
+                )
+                conn.exec_driver_sql(
+                    "DELETE FROM main.conversations WHERE id IN (SELECT id FROM temp.archive_batch) "
+                    "AND id IN (SELECT id FROM archive.conversations)"
+                )
+                conn.commit()
+                total += count
+            conn.exec_driver_sql("DROP TABLE IF EXISTS temp.archive_batch")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.exec_driver_sql("DETACH DATABASE archive")
+        if total:
+            logger.info(f"Archived {total} conversations into {archive_path.name}")
+        return total
+
+    def run(self) -> Dict:
+        """Job-ul de compactare: expirare, apoi arhivare"""
+        try:
+            expired = self.expire_conversations()
+            archived = self.archive_conversations()
+            logger.info(f"Compaction: {expired} conversations expired, "
+                        f"{sum(archived.values())} archived")
+            return {'expired': expired, 'archived': archived}
+        except Exception as e:
+            logger.error(f"Error in compaction job: {str(e)}")
+            return {'error': str(e)}
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from .db import Base
 
@@ -14,4 +14,11 @@ class Conversation(Base):
     last_interaction = Column(DateTime, default=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    interactions = relationship('Interaction', back_populates='conversation')
\ No newline at end of file
+    interactions = relationship('Interaction', back_populates='conversation')
+
+    __table_args__ = (
+        # Histograma orară și activitatea recentă de pe dashboard
+        Index('ix_conversations_last_interaction', 'last_interaction'),
+        # Numărul de conversații active azi, răspuns direct din index
+        Index('ix_conversations_active_last_interaction', 'is_active', 'last_interaction'),
+    )
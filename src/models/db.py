@@ -1,10 +1,76 @@
-from sqlalchemy import create_engine
+import logging
+import threading
+from pathlib import Path
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from ..config.settings import Config
+
+logger = logging.getLogger(__name__)
 
 Base = declarative_base()
-engine = create_engine('sqlite:///instagram_bot.db')
-SessionLocal = sessionmaker(bind=engine)
+
+def create_db_engine(uri: str = None, mmap_size: int = Config.SQLITE_MMAP_SIZE):
+    """Creează engine-ul din configurație; pentru SQLite activează WAL și mmap"""
+    engine = create_engine(uri or Config.SQLALCHEMY_DATABASE_URI)
+
+    if engine.dialect.name == 'sqlite':
+        @event.listens_for(engine, 'connect')
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+            cursor.close()
+
+    return engine
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """Engine-ul aplicației, creat la prima utilizare (nu la import)"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                if Config.SQLALCHEMY_DATABASE_URI.startswith('sqlite:///'):
+                    Config.init_dirs()
+                _engine = create_db_engine()
+    return _engine
+
+class LazySessionmaker(sessionmaker):
+    """sessionmaker care se leagă de engine abia la prima sesiune creată"""
+
+    def __call__(self, **local_kw):
+        if self.kw.get('bind') is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+SessionLocal = LazySessionmaker()
+
+def __getattr__(name):
+    # Compatibilitate: `from .db import engine` creează engine-ul la cerere
+    if name == 'engine':
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def init_db():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    engine = get_engine()
+    Base.metadata.create_all(bind=engine)
+    migrate_db()
+
+    # Versiunile vechi creau baza de date în directorul curent
+    legacy_db = Path('instagram_bot.db').resolve()
+    if legacy_db.exists() and str(legacy_db) != engine.url.database:
+        logger.warning(
+            f"Found legacy database at {legacy_db}; the configured database is "
+            f"{engine.url.database}. Move the file there to keep existing data."
+        )
+
+def migrate_db(bind=None):
+    """Adaugă indexurile lipsă în tabelele create de versiuni mai vechi"""
+    bind = bind or get_engine()
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
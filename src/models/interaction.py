@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .db import Base
 
@@ -14,4 +14,9 @@ class Interaction(Base):
     direction = Column(String(10), nullable=False)  # incoming/outgoing
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    conversation = relationship('Conversation', back_populates='interactions')
\ No newline at end of file
+    conversation = relationship('Conversation', back_populates='interactions')
+
+    __table_args__ = (
+        Index('ix_interactions_conversation_created', 'conversation_id', 'created_at'),
+        Index('ix_interactions_created_at', 'created_at'),
+    )
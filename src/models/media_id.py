@@ -0,0 +1,11 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime
+from .db import Base
+
+class MediaIdMapping(Base):
+    __tablename__ = 'media_ids'
+
+    # Maparea shortcode -> media_id nu se schimbă niciodată
+    post_shortcode = Column(String(100), primary_key=True)
+    media_id = Column(String(50), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
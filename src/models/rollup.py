@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from .db import Base
+
+class MetricRollup(Base):
+    __tablename__ = 'metric_rollups'
+
+    id = Column(Integer, primary_key=True)
+    resolution = Column(String(10), nullable=False)  # minute, hour, day
+    bucket_start = Column(DateTime, nullable=False)
+    action_type = Column(String(50), nullable=False)
+    success_count = Column(Integer, default=0, nullable=False)
+    failure_count = Column(Integer, default=0, nullable=False)
+    rate_limit_errors = Column(Integer, default=0, nullable=False)
+    network_errors = Column(Integer, default=0, nullable=False)
+    auth_errors = Column(Integer, default=0, nullable=False)
+    other_errors = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('resolution', 'bucket_start', 'action_type',
+                         name='uq_metric_rollups_bucket'),
+    )
@@ -0,0 +1,162 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, insert, select, update
+
+from .conversation import Conversation
+from .interaction import Interaction
+
+logger = logging.getLogger(__name__)
+
+# SQLite acceptă un număr limitat de parametri per interogare
+IN_CHUNK_SIZE = 500
+
+
+def _chunks(items: List, size: int) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class InteractionWriteBuffer:
+    """Colectează conversațiile și interacțiunile unei rulări și le scrie în lot
+
+    La flush: o interogare IN (...) per lot pentru shortcode-urile existente,
+    insert-uri bulk pentru conversațiile și interacțiunile noi și un singur
+    UPDATE executemany pentru interaction_count/last_interaction, totul într-o
+    singură tranzacție.
+    """
+
+    def __init__(self, session_factory: Callable, batch_size: int = 500,
+                 on_flush: Optional[Callable] = None):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.on_flush = on_flush
+        self._conversations: Dict[str, Dict] = {}
+        self._interactions: List[Dict] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._conversations) + len(self._interactions)
+
+    def add_conversation(self, shortcode: str, content: Optional[str] = None):
+        """Marchează o postare ca văzută; conversația se creează doar dacă lipsește"""
+        with self._lock:
+            row = self._conversations.setdefault(shortcode, {'post_content': None})
+            if content is not None:
+                row['post_content'] = content
+        self._flush_if_full()
+
+    def add_interaction(self, shortcode: str, interaction_type: str, content: Optional[str] = None,
+                        direction: str = 'outgoing', user_id: Optional[str] = None):
+        """Înregistrează o interacțiune pentru postarea dată"""
+        with self._lock:
+            self._conversations.setdefault(shortcode, {'post_content': None})
+            self._interactions.append({
+                'shortcode': shortcode,
+                'type': interaction_type,
+                'content': content,
+                'user_id': user_id,
+                'direction': direction,
+                'created_at': datetime.utcnow(),
+            })
+        self._flush_if_full()
+
+    def _flush_if_full(self):
+        if len(self) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> int:
+        """Scrie tot ce s-a acumulat; întoarce numărul de interacțiuni scrise"""
+        with self._flush_lock:
+            with self._lock:
+                conversations, self._conversations = self._conversations, {}
+                interactions, self._interactions = self._interactions, []
+            if not conversations:
+                return 0
+
+            session = self.session_factory()
+            try:
+                written = self._write(session, conversations, interactions)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Error flushing interaction buffer: {str(e)}")
+                # Se păstrează pentru următorul flush
+                with self._lock:
+                    for shortcode, row in conversations.items():
+                        self._conversations.setdefault(shortcode, row)
+                    self._interactions[:0] = interactions
+                return 0
+            finally:
+                session.close()
+
+        if self.on_flush:
+            self.on_flush(list(conversations))
+        return written
+
+    def _existing_ids(self, session, shortcodes: List[str]) -> Dict[str, int]:
+        ids = {}
+        for chunk in _chunks(shortcodes, IN_CHUNK_SIZE):
+            rows = session.execute(
+                select(Conversation.post_shortcode, Conversation.id)
+                .where(Conversation.post_shortcode.in_(chunk))
+            )
+            ids.update((shortcode, id_) for shortcode, id_ in rows)
+        return ids
+
+    def _write(self, session, conversations: Dict[str, Dict], interactions: List[Dict]) -> int:
+        # Totalurile pe conversație din lotul curent
+        deltas: Dict[str, Dict] = {}
+        for interaction in interactions:
+            delta = deltas.setdefault(interaction['shortcode'], {'count': 0, 'last': None})
+            delta['count'] += 1
+            delta['last'] = max(delta['last'] or interaction['created_at'], interaction['created_at'])
+
+        shortcodes = list(conversations)
+        ids = self._existing_ids(session, shortcodes)
+
+        now = datetime.utcnow()
+        new_rows = [{
+            'post_shortcode': shortcode,
+            'post_content': conversations[shortcode]['post_content'],
+            'is_active': True,
+            'interaction_count': deltas.get(shortcode, {}).get('count', 0),
+            'last_interaction': deltas.get(shortcode, {}).get('last') or now,
+            'created_at': now,
+        } for shortcode in shortcodes if shortcode not in ids]
+        if new_rows:
+            session.execute(insert(Conversation.__table__), new_rows)
+            ids.update(self._existing_ids(session, [row['post_shortcode'] for row in new_rows]))
+        new_shortcodes = {row['post_shortcode'] for row in new_rows}
+
+        if interactions:
+            session.execute(insert(Interaction.__table__), [{
+                'conversation_id': ids[interaction['shortcode']],
+                'type': interaction['type'],
+                'content': interaction['content'],
+                'user_id': interaction['user_id'],
+                'direction': interaction['direction'],
+                'created_at': interaction['created_at'],
+            } for interaction in interactions])
+
+        # Conversațiile existente primesc contorul și data într-un singur executemany
+        updates = [{
+            'b_id': ids[shortcode],
+            'b_delta': delta['count'],
+            'b_last': delta['last'],
+        } for shortcode, delta in deltas.items() if shortcode not in new_shortcodes]
+        if updates:
+            table = Conversation.__table__
+            session.execute(
+                update(table)
+                .where(table.c.id == bindparam('b_id'))
+                .values(
+                    interaction_count=table.c.interaction_count + bindparam('b_delta'),
+                    last_interaction=bindparam('b_last'),
+                ),
+                updates
+            )
+        return len(interactions)
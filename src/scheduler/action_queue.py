@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+from ..utils.histogram import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+QUEUE_LAG = REGISTRY.histogram(
+    'action_queue_lag_seconds', 'How late queued actions start after they become due'
+)
+
+@dataclass
+class PendingAction:
+    func: Callable
+    args: Tuple
+    kwargs: Dict
+    delay: float
+    skip_if: Optional[Callable[[], bool]] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+    checked: bool = False
+
+
+class ActionQueue:
+    """Coadă de acțiuni cu pauze între ele, fără time.sleep în thread-urile job-urilor
+
+    Acțiunile rulează în ordinea în care au fost adăugate, pe un singur thread
+    dispatcher. Fiecare acțiune pornește la `delay` secunde după terminarea
+    celei precedente (sau după adăugare, dacă coada era goală) - aceeași
+    cadență ca vechiul wait_if_needed urmat de acțiune.
+    """
+
+    def __init__(self, name: str = 'action-queue'):
+        self.name = name
+        self._pending: Deque[PendingAction] = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self._running = False
+        self._last_finished = 0.0
+        self._paused_until = 0.0
+
+    def start(self):
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Oprește dispatcher-ul; acțiunile rămase în coadă sunt abandonate"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join()
+
+    def submit(self, func: Callable, *args, delay: float = 0.0,
+               skip_if: Optional[Callable[[], bool]] = None, **kwargs):
+        """Adaugă o acțiune care va rula la `delay` secunde după cea precedentă
+
+        `skip_if` se evaluează o dată, când acțiunea ajunge prima în coadă;
+        dacă întoarce True, acțiunea se abandonează fără să consume pauza.
+        """
+        with self._cond:
+            self._pending.append(PendingAction(func, args, kwargs, delay, skip_if))
+            self._cond.notify_all()
+
+    def pause(self, seconds: float):
+        """Amână toate acțiunile în așteptare (ex. după un 429)"""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def next_due_in(self) -> float:
+        """Secunde până la următoarea acțiune (0 dacă e scadentă sau coada e goală)"""
+        with self._cond:
+            if not self._pending:
+                return 0.0
+            return max(0.0, self._due(self._pending[0]) - time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def join(self, timeout: float = None) -> bool:
+        """Așteaptă golirea cozii; întoarce False la timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _due(self, action: PendingAction) -> float:
+        return max(action.enqueued_at, self._last_finished, self._paused_until) + action.delay
+
+    def _should_skip(self, action: PendingAction) -> bool:
+        try:
+            return bool(action.skip_if())
+        except Exception as e:
+            # La eroare acțiunea rulează normal; verificarea ei completă e în acțiune
+            logger.error(f"Error in skip check for {getattr(action.func, '__name__', action.func)}: {str(e)}")
+            return False
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and not self._pending:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+
+                head = self._pending[0]
+                if head.skip_if is not None and not head.checked:
+                    head.checked = True
+                    if self._should_skip(head):
+                        # Acțiunea refuzată nu așteaptă pauza și nu ține coada ocupată
+                        self._pending.popleft()
+                        self._cond.notify_all()
+                        continue
+
+                # Thread-ul dispecer așteaptă pe condiție, nu ține resurse ocupate
+                wait = self._due(self._pending[0]) - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                action = self._pending.popleft()
+                self._running = True
+            QUEUE_LAG.observe(-wait)
+
+            try:
+                action.func(*action.args, **action.kwargs)
+            except Exception as e:
+                logger.error(f"Error in queued action {getattr(action.func, '__name__', action.func)}: {str(e)}")
+            finally:
+                with self._cond:
+                    self._last_finished = time.monotonic()
+                    self._running = False
+                    self._cond.notify_all()
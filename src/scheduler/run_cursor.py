@@ -0,0 +1,75 @@
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Set
+
+logger = logging.getLogger(__name__)
+
+class FeedRunCursor:
+    """Progresul rulării curente a feed-ului, salvat după fiecare postare terminată
+
+    Dacă o rulare e întreruptă (restart, crash), următoarea continuă de la
+    ultima postare procesată în loc să reia totul de la capăt.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.run_id = None
+        self.started_at = None
+        self.processed: Set[str] = set()
+        self.completed = True
+        self._load()
+
+    def _load(self):
+        try:
+            if self.path.exists():
+                state = json.loads(self.path.read_text())
+                self.run_id = state.get('run_id')
+                self.started_at = state.get('started_at')
+                self.processed = set(state.get('processed', []))
+                self.completed = state.get('completed', True)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error loading feed cursor: {str(e)}")
+
+    def _save(self):
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps({
+            'run_id': self.run_id,
+            'started_at': self.started_at,
+            'processed': sorted(self.processed),
+            'completed': self.completed,
+        }))
+        os.replace(tmp_path, self.path)
+
+    def begin(self) -> bool:
+        """Pornește o rulare; întoarce True dacă se reia una întreruptă"""
+        with self._lock:
+            if not self.completed:
+                logger.info(f"Resuming feed run {self.run_id} "
+                            f"({len(self.processed)} posts already processed)")
+                return True
+            self.run_id = uuid.uuid4().hex
+            self.started_at = datetime.utcnow().isoformat()
+            self.processed = set()
+            self.completed = False
+            self._save()
+            return False
+
+    def is_processed(self, shortcode: str) -> bool:
+        return shortcode in self.processed
+
+    def mark_processed(self, shortcode: str):
+        with self._lock:
+            self.processed.add(shortcode)
+            self._save()
+
+    def complete(self):
+        with self._lock:
+            self.completed = True
+            self.processed = set()
+            self._save()
@@ -1,62 +1,195 @@
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from datetime import datetime
+from typing import TYPE_CHECKING
 import logging
+import threading
+import time
 
+from ..config.settings import Config
 from ..models.db import SessionLocal
-from ..services.instagram_service import InstagramService
-from ..services.feed_service import FeedService
-from ..services.gemini_service import GeminiService
+from ..models.archive import ConversationArchiver
+from ..models.write_buffer import InteractionWriteBuffer
+from ..services.container import ServiceContainer
 from ..utils.rate_limiter import RateLimiter
+from ..utils.rate_limit_store import SQLiteRateLimitStore
+from ..utils.media_cache import MediaIdCache
+from ..utils.seen_index import SeenShortcodeIndex
+from ..utils.activity_feed import ActivityFeed
+from ..utils.histogram import REGISTRY, timed
+from ..utils.error_handler import ErrorHandler, get_status_code
+from ..utils.profiler import job_memory_profile, start_job_memory_profile
+from .action_queue import ActionQueue
+from .run_cursor import FeedRunCursor
+
+if TYPE_CHECKING:
+    from ..services.instagram_service import InstagramService
 
 logger = logging.getLogger(__name__)
 
+ACTION_LATENCY = REGISTRY.histogram(
+    'task_perform_action_seconds', 'Duration of a rate-limited action, by type'
+)
+FEED_RUN_DURATION = REGISTRY.histogram(
+    'feed_run_seconds', 'Feed run duration, from job start until its queued actions finish'
+)
+FEED_JOB_LAG = REGISTRY.histogram(
+    'feed_job_lag_seconds', 'Delay between the scheduled and the actual start of feed jobs'
+)
+
+def process_feed_job():
+    """Punctul de intrare al job-ului persistat (referință textuală, serializabilă)"""
+    if TaskManager.active is None:
+        logger.warning("No active TaskManager, skipping process_feed job")
+        return
+    TaskManager.active.process_feed()
+
+def compact_conversations_job():
+    """Job-ul persistat de expirare și arhivare a conversațiilor"""
+    if TaskManager.active is None:
+        logger.warning("No active TaskManager, skipping compaction job")
+        return
+    with job_memory_profile('compact_conversations'):
+        TaskManager.active.archiver.run()
+
 class TaskManager:
-    def __init__(self, cookie_file: str, gemini_api_key: str):
+    active = None
+
+    def __init__(self, cookie_file: str, gemini_api_key: str, metrics=None,
+                 activity: ActivityFeed = None):
         self.cookie_file = cookie_file
         self.gemini_api_key = gemini_api_key
-        self.rate_limiter = RateLimiter()
+        self.metrics = metrics
+        Config.init_dirs()
+        # Jurnalul de activitate al dashboard-ului (aceeași instanță, dacă rulează în proces)
+        self.activity = activity or ActivityFeed(SessionLocal)
+        # Cache-ul supraviețuiește între rulări, deci se creează o singură dată
+        self.media_cache = MediaIdCache(SessionLocal, metrics=metrics)
+        self.services = ServiceContainer(cookie_file, gemini_api_key, media_cache=self.media_cache,
+                                         metrics=metrics)
+        self.rate_limiter = RateLimiter(store=SQLiteRateLimitStore(Config.RATE_LIMIT_DB))
+        self.action_queue = ActionQueue()
+        # Postările deja văzute se recunosc în memorie, fără interogări per postare
+        self.seen_index = SeenShortcodeIndex(SessionLocal, Config.SEEN_INDEX_FILE)
+        # Conversațiile și interacțiunile rulării se scriu în lot, la final
+        self.write_buffer = InteractionWriteBuffer(SessionLocal, on_flush=self.seen_index.add)
+        # Raportează tranzițiile circuitelor HTTP în metrici
+        self.error_handler = ErrorHandler(metrics, self.action_queue) if metrics else None
+        # Tabelele active rămân limitate la fereastra activă
+        self.archiver = ConversationArchiver()
         self.scheduler = None
+
+        # O singură rulare a feed-ului la un moment dat, reluabilă după întrerupere
+        self.cursor = FeedRunCursor(Config.FEED_CURSOR_FILE)
+        self._feed_lock = threading.Lock()
+        self._run_started = 0.0
+        self._memory_capture = None
         
     def init_services(self):
-        """Inițializează serviciile necesare"""
-        instagram_service = InstagramService(self.cookie_file)
-        gemini_service = GeminiService(self.gemini_api_key)
-        feed_service = FeedService(instagram_service, gemini_service)
-        return instagram_service, gemini_service, feed_service
+        """Întoarce serviciile (construite o singură dată, refolosite între rulări)"""
+        return self.services.get()
         
     def process_feed(self):
         """Task pentru procesarea feed-ului"""
+        # Rularea ține până când acțiunile ei din coadă s-au terminat
+        if not self._feed_lock.acquire(blocking=False):
+            logger.warning("Previous feed run still in progress, skipping")
+            if self.metrics:
+                self.metrics.increment('feed_runs_skipped')
+            return
+
+        self._run_started = time.perf_counter()
+        # Acțiunile rulează în coadă; captura se închide în _finish_feed_run
+        self._memory_capture = start_job_memory_profile('process_feed')
+        completed = False
         try:
             instagram, gemini, feed = self.init_services()
+            if self.cursor.begin():
+                # Conversațiile lor erau doar în buffer la întrerupere; altfel s-ar procesa din nou
+                for shortcode in sorted(self.cursor.processed):
+                    self.write_buffer.add_conversation(shortcode)
+            self.seen_index.refresh()
+
             session = SessionLocal()
-            
-            results = feed.process_feed(session)
+            try:
+                with timed('feed_process_seconds', 'Duration of FeedService.process_feed'):
+                    results = feed.process_feed(session)
+            finally:
+                session.close()
             logger.info(f"Processed {len(results)} posts from feed")
+            unseen = set(self.seen_index.unseen(
+                result['post']['shortcode'] for result in results if result['status'] == 'new'
+            ))
             
+            # Acțiunile intră în coadă cu pauza lor; job-ul nu mai doarme
             for result in results:
                 if result['status'] == 'new' and 'action' in result:
+                    post = result['post']
+                    if (post['shortcode'] not in unseen or
+                            self.cursor.is_processed(post['shortcode'])):
+                        continue
+                    self.write_buffer.add_conversation(post['shortcode'], post.get('caption'))
                     action = result['action']
                     if action['action'] in ['like', 'both']:
-                        self._perform_action('like', instagram, result['post'])
+                        self._queue_action('like', instagram, post)
                     if action['action'] in ['comment', 'both']:
-                        self._perform_action('comment', instagram, result['post'], 
-                                          text=action['response'])
-                        
-            session.close()
+                        self._queue_action('comment', instagram, post,
+                                           text=action['response'])
+                    self.action_queue.submit(self.cursor.mark_processed, post['shortcode'])
+
+            completed = True
         except Exception as e:
             logger.error(f"Error in process_feed task: {str(e)}")
+        finally:
+            # Și la eroare: lock-ul se eliberează abia după acțiunile deja puse în coadă
+            self.action_queue.start()
+            self.action_queue.submit(self.write_buffer.flush)
+            self.action_queue.submit(self._finish_feed_run, completed)
+
+    def _finish_feed_run(self, completed: bool = True):
+        """Rulează în coadă după ultima acțiune a rulării curente"""
+        try:
+            # O rulare întreruptă de o eroare rămâne deschisă și se reia data viitoare
+            if completed:
+                self.cursor.complete()
+                FEED_RUN_DURATION.observe(time.perf_counter() - self._run_started)
+            self.seen_index.save()
+        finally:
+            self._finish_memory_capture()
+            self._feed_lock.release()
+
+    def _finish_memory_capture(self):
+        capture, self._memory_capture = self._memory_capture, None
+        if capture:
+            capture.finish()
+
+    def _on_job_submitted(self, event):
+        # Histograma e doar pentru feed; job-ul de compactare are alt program
+        if event.job_id != 'process_feed':
+            return
+        now = datetime.now().astimezone()
+        for run_time in event.scheduled_run_times:
+            FEED_JOB_LAG.observe(max(0.0, (now - run_time).total_seconds()))
             
-    def _perform_action(self, action_type: str, instagram: InstagramService, 
+    def _queue_action(self, action_type: str, instagram: 'InstagramService',
+                      post: dict, **kwargs):
+        """Programează o acțiune după pauza cerută de rate limiter"""
+        # Cu limita atinsă, acțiunea se abandonează înainte de pauză, nu după ea
+        self.action_queue.submit(self._perform_action, action_type, instagram, post,
+                                 delay=self.rate_limiter.get_delay(action_type),
+                                 skip_if=lambda: not self.rate_limiter.can_perform_action(action_type),
+                                 **kwargs)
+
+    def _perform_action(self, action_type: str, instagram: 'InstagramService', 
                        post: dict, **kwargs):
         """Execută o acțiune cu respectarea rate limiting"""
-        if not self.rate_limiter.can_perform_action(action_type):
+        # Rezervarea e atomică între procese; se eliberează dacă acțiunea eșuează
+        reservation = self.rate_limiter.try_acquire(action_type)
+        if not reservation:
             logger.warning(f"Rate limit reached for {action_type}")
             return
             
+        start = time.perf_counter()
+        status, details, status_code = 'error', None, None
         try:
-            self.rate_limiter.wait_if_needed(action_type)
-            
             if action_type == 'like':
                 result = instagram.like_post(post['shortcode'])
             elif action_type == 'comment':
@@ -64,34 +197,83 @@ class TaskManager:
                                                 kwargs.get('text', 'Great! ✨'))
                 
             if 'error' not in result:
-                self.rate_limiter.log_action(action_type)
+                status = 'success'
+                self.write_buffer.add_interaction(post['shortcode'], action_type,
+                                                  content=kwargs.get('text'))
                 logger.info(f"Successfully performed {action_type} on {post['shortcode']}")
             else:
+                details = str(result['error'])
+                status_code = result.get('status_code')
+                self.rate_limiter.release(action_type, reservation)
                 logger.error(f"Failed to perform {action_type}: {result['error']}")
                 
         except Exception as e:
+            details = str(e)
+            status_code = get_status_code(e)
+            self.rate_limiter.release(action_type, reservation)
             logger.error(f"Error performing {action_type}: {str(e)}")
+        finally:
+            latency = time.perf_counter() - start
+            ACTION_LATENCY.observe(latency, action=action_type)
+            self.activity.record(action_type, status, post['shortcode'], latency, details)
+            if self.metrics:
+                # status_code și error permit încadrarea erorii (classify_error)
+                metric_details = {'shortcode': post['shortcode'],
+                                  'latency_ms': round(latency * 1000, 1)}
+                if status != 'success':
+                    metric_details.update(error=details, status_code=status_code)
+                self.metrics.track_action(action_type, status == 'success', metric_details)
     
     def start(self):
         """Pornește sistemul de task-uri programate"""
+        # APScheduler se încarcă doar de procesul care rulează efectiv job-urile
+        from apscheduler.schedulers.background import BackgroundScheduler
+        from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+        from apscheduler.events import EVENT_JOB_SUBMITTED
+
         try:
             jobstores = {
-                'default': SQLAlchemyJobStore(url='sqlite:///jobs.db')
+                'default': SQLAlchemyJobStore(url=Config.JOBS_DATABASE_URI)
             }
             
             self.scheduler = BackgroundScheduler(jobstores=jobstores)
+            self.scheduler.add_listener(self._on_job_submitted, EVENT_JOB_SUBMITTED)
+            TaskManager.active = self
             
-            # Adaugă task-urile programate
+            # Adaugă task-urile programate; rulările ratate se comasează într-una singură
             self.scheduler.add_job(
-                self.process_feed,
+                f'{__name__}:process_feed_job',
                 'interval',
-                minutes=5,
-                id='process_feed'
+                minutes=Config.FEED_INTERVAL_MINUTES,
+                id='process_feed',
+                max_instances=1,
+                coalesce=True,
+                misfire_grace_time=Config.FEED_MISFIRE_GRACE_SECONDS,
+                replace_existing=True
+            )
+            self.scheduler.add_job(
+                f'{__name__}:compact_conversations_job',
+                'interval',
+                minutes=Config.ARCHIVE_INTERVAL_MINUTES,
+                id='compact_conversations',
+                max_instances=1,
+                coalesce=True,
+                replace_existing=True
             )
             
+            self.action_queue.start()
             self.scheduler.start()
             logger.info("Scheduler started successfully")
             
         except Exception as e:
             logger.error(f"Failed to start scheduler: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    def stop(self):
+        """Oprește scheduler-ul și coada de acțiuni"""
+        if self.scheduler:
+            self.scheduler.shutdown(wait=False)
+        self.action_queue.stop()
+        self.write_buffer.flush()
+        if self.error_handler:
+            self.error_handler.close()
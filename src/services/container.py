@@ -0,0 +1,50 @@
+import logging
+import threading
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from ..utils.media_cache import MediaIdCache
+
+if TYPE_CHECKING:
+    from .instagram_service import InstagramService
+    from .feed_service import FeedService
+    from .gemini_service import GeminiService
+
+logger = logging.getLogger(__name__)
+
+class ServiceContainer:
+    """Construiește serviciile o singură dată și le refolosește între rulări"""
+
+    def __init__(self, cookie_file: str, gemini_api_key: str,
+                 media_cache: Optional[MediaIdCache] = None, metrics=None):
+        self.cookie_file = cookie_file
+        self.gemini_api_key = gemini_api_key
+        self.media_cache = media_cache
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._services = None
+
+    def get(self) -> Tuple['InstagramService', 'GeminiService', 'FeedService']:
+        """Întoarce serviciile existente; cookie-urile se reîncarcă doar la schimbare"""
+        with self._lock:
+            if self._services is None:
+                # requests, clientul Gemini etc. se încarcă abia la prima rulare
+                from .instagram_service import InstagramService
+                from .feed_service import FeedService
+                from .gemini_service import GeminiService
+
+                instagram_service = InstagramService(self.cookie_file, media_cache=self.media_cache,
+                                                     metrics=self.metrics)
+                gemini_service = GeminiService(self.gemini_api_key)
+                feed_service = FeedService(instagram_service, gemini_service)
+                self._services = (instagram_service, gemini_service, feed_service)
+                logger.info("Services initialized")
+            elif self._services[0].reload_cookies_if_changed():
+                logger.info("Cookie file changed, cookies reloaded")
+            return self._services
+
+    def reset(self):
+        """Forțează reconstruirea serviciilor la următorul apel"""
+        with self._lock:
+            if self._services:
+                self._services[0].session.close()
+            self._services = None
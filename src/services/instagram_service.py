@@ -1,16 +1,73 @@
+import os
 import requests
 import logging
 import re
-from typing import Optional, Dict
+import time
+from typing import Optional, Dict, Iterable
+from requests.adapters import HTTPAdapter
+from ..config.settings import Config
 from ..utils.cookie_manager import CookieManager
+from ..utils.error_handler import BREAKERS, CircuitOpenError, is_endpoint_failure
+from ..utils.histogram import REGISTRY, timed
+from ..utils.logger import log_request, url_template
+from ..utils.media_cache import MediaIdCache
 
 logger = logging.getLogger(__name__)
 
+MEDIA_ID_PATTERN = re.compile(rb'"media_id":"(\d+)"')
+MEDIA_ID_CHUNK_SIZE = 16 * 1024
+# Cât păstrăm din bucata anterioară ca o potrivire să poată traversa granița
+MEDIA_ID_OVERLAP = 64
+# Cât se mai citește după potrivire ca conexiunea keep-alive să revină în pool
+MEDIA_ID_DRAIN_LIMIT = 1024 * 1024
+
+HTTP_LATENCY = REGISTRY.histogram(
+    'instagram_http_request_seconds',
+    'Time until response headers for Instagram HTTP requests'
+)
+
+def extract_media_id(chunks: Iterable[bytes]) -> Optional[str]:
+    """Caută media_id în bucăți de bytes și se oprește la prima potrivire"""
+    tail = b''
+    for chunk in chunks:
+        buffer = tail + chunk
+        match = MEDIA_ID_PATTERN.search(buffer)
+        if match:
+            return match.group(1).decode('ascii')
+        tail = buffer[-MEDIA_ID_OVERLAP:]
+    return None
+
+def drain(chunks: Iterable[bytes], limit: int) -> bool:
+    """Consumă restul corpului; False dacă depășește `limit` bytes (se renunță)"""
+    drained = 0
+    for chunk in chunks:
+        drained += len(chunk)
+        if drained > limit:
+            return False
+    return True
+
 class InstagramService:
-    def __init__(self, cookie_file: str):
+    def __init__(self, cookie_file: str, media_cache: Optional[MediaIdCache] = None,
+                 pool_size: int = Config.HTTP_POOL_SIZE, base_url: str = None, metrics=None):
+        self.cookie_file = cookie_file
+        self.base_url = (base_url or Config.INSTAGRAM_BASE_URL).rstrip('/')
+        self.media_cache = media_cache
+        self.metrics = metrics
         self.cookie_manager = CookieManager()
-        self.cookies = self.cookie_manager.load_cookies(cookie_file)
+
+        # Sesiune de lungă durată: conexiunile keep-alive rămân în pool între rulări
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._cookies_mtime = None
+        self.refresh_cookies()
+
+    def refresh_cookies(self):
+        """Reîncarcă cookie-urile din fișier și actualizează sesiunea"""
+        mtime = os.path.getmtime(self.cookie_file)
+        self.cookies = self.cookie_manager.load_cookies(self.cookie_file)
         self.headers = self.cookie_manager.get_headers(self.cookies)
         
         # Setup session
@@ -20,15 +77,70 @@ class InstagramService:
                 value=cookie['value'],
                 domain='.instagram.com'
             )
+        self._cookies_mtime = mtime
 
+    def reload_cookies_if_changed(self) -> bool:
+        """Reîncarcă cookie-urile doar dacă fișierul s-a modificat"""
+        try:
+            if os.path.getmtime(self.cookie_file) == self._cookies_mtime:
+                return False
+        except OSError as e:
+            logger.error(f'Cannot stat cookie file: {str(e)}')
+            return False
+        self.refresh_cookies()
+        return True
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Request prin sesiunea comună, cu circuit breaker și latența în histogramă"""
+        endpoint = url_template(url)
+        breaker = BREAKERS.get(f'{method} {endpoint}')
+        if not breaker.allow():
+            raise CircuitOpenError(breaker.endpoint, breaker.retry_after())
+
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            breaker.record_failure()
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_LATENCY.observe(elapsed, method=method, endpoint=endpoint)
+        # Același timp ca în histogramă (până la header-e), pentru log_query latency
+        log_request(logger, method, url, response.status_code, elapsed)
+
+        if is_endpoint_failure(response.status_code):
+            retry_after = response.headers.get('Retry-After', '')
+            breaker.record_failure(float(retry_after) if retry_after.isdigit() else None)
+        elif 400 <= response.status_code < 500:
+            breaker.record_ignored()
+        else:
+            breaker.record_success()
+        return response
+
+    @timed('instagram_get_media_id_seconds', 'Total time to resolve a shortcode to a media_id')
     def get_media_id(self, shortcode: str) -> Optional[str]:
-        url = f'https://www.instagram.com/p/{shortcode}/'
+        if self.media_cache:
+            media_id = self.media_cache.get(shortcode)
+            if media_id:
+                return media_id
+
+        url = f'{self.base_url}/p/{shortcode}/'
         try:
-            response = self.session.get(url)
-            if response.status_code == 200:
-                match = re.search(r'"media_id":"(\d+)"', response.text)
-                if match:
-                    return match.group(1)
+            # Pagina e citită în bucăți, până la prima potrivire
+            with self._request('GET', url, stream=True) as response:
+                chunks = response.iter_content(chunk_size=MEDIA_ID_CHUNK_SIZE)
+                media_id = extract_media_id(chunks) if response.status_code == 200 else None
+                # Un corp necitit până la capăt închide conexiunea în loc să o refolosească
+                if not drain(chunks, MEDIA_ID_DRAIN_LIMIT):
+                    logger.warning(f'Post page for {shortcode} exceeds the drain limit, '
+                                   f'closing the connection')
+                    if self.metrics:
+                        self.metrics.increment('media_page_drain_exceeded')
+            if media_id:
+                if self.media_cache:
+                    self.media_cache.set(shortcode, media_id)
+                return media_id
             logger.error(f'Failed to get media_id for {shortcode}')
         except Exception as e:
             logger.error(f'Error getting media_id: {str(e)}')
@@ -39,14 +151,17 @@ class InstagramService:
         if not media_id:
             return {"error": "Media ID not found"}
 
-        like_url = f'https://www.instagram.com/web/likes/{media_id}/like/'
+        like_url = f'{self.base_url}/web/likes/{media_id}/like/'
         try:
-            response = self.session.post(
+            response = self._request(
+                'POST',
                 like_url,
                 headers=self.headers,
                 data={'surface': 'www_feed'}
             )
-            return response.json() if response.status_code == 200 else {"error": "Failed to like"}
+            if response.status_code != 200:
+                return {"error": "Failed to like", "status_code": response.status_code}
+            return response.json()
         except Exception as e:
             logger.error(f'Error liking post: {str(e)}')
             return {"error": str(e)}
@@ -56,14 +171,18 @@ class InstagramService:
         if not media_id:
             return {"error": "Media ID not found"}
 
-        comment_url = f'https://www.instagram.com/web/comments/{media_id}/add/'
+        comment_url = f'{self.base_url}/web/comments/{media_id}/add/'
         try:
-            response = self.session.post(
+            response = self._request(
+                'POST',
                 comment_url,
                 headers=self.headers,
                 data={'comment_text': text}
             )
-            return response.json() if response.status_code == 200 else {"error": f"Failed to comment: {response.status_code}"}
+            if response.status_code != 200:
+                return {"error": f"Failed to comment: {response.status_code}",
+                        "status_code": response.status_code}
+            return response.json()
         except Exception as e:
             logger.error(f'Error commenting on post: {str(e)}')
-            return {"error": str(e)}"
\ No newline at end of file
+            return {"error": str(e)}
\ No newline at end of file
@@ -0,0 +1,155 @@
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from ..models.activity import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+
+def activity_row(row_id: int, action_type: str, status: str, post_shortcode: Optional[str],
+                 latency_ms: Optional[float], details: Optional[str], created_at: datetime) -> Dict:
+    """Formatul comun pentru dashboard (tabelul de activitate și stream-ul SSE)"""
+    text = f"Post: {post_shortcode}" if post_shortcode else ''
+    if details:
+        text = f"{text} - {details}" if text else details
+    return {
+        "id": row_id,
+        "time": created_at.strftime("%H:%M:%S"),
+        "action": action_type,
+        "status": status,
+        "latency_ms": round(latency_ms, 1) if latency_ms is not None else None,
+        "details": text
+    }
+
+
+class ActivityFeed:
+    """Jurnalul de activitate: un INSERT per acțiune + coada ultimelor rânduri în memorie
+
+    Vizualizarea implicită (ultimele `tail_size` rânduri) se servește doar din
+    memorie: record() adaugă rândurile proprii, iar sync(), apelat periodic în
+    afara cererilor, aduce rândurile `id > ultimul id sincronizat` scrise de alte
+    procese (ex. scheduler-ul). Paginile mai vechi se citesc cu keyset
+    (`id < before`), deci costul nu depinde de cât de departe se derulează.
+    """
+
+    def __init__(self, session_factory: Callable, tail_size: int = 50):
+        self.session_factory = session_factory
+        self.tail_size = tail_size
+        self._tail: Deque[Dict] = deque(maxlen=tail_size)
+        self._listeners: List[Callable] = []
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        # Cel mai mare id citit din DB; None până la prima încărcare a cozii
+        self._synced_id: Optional[int] = None
+
+    def add_listener(self, callback: Callable):
+        """callback(row) pentru fiecare rând nou"""
+        self._listeners.append(callback)
+
+    def record(self, action_type: str, status: str, post_shortcode: str = None,
+               latency: float = None, details: str = None) -> Optional[Dict]:
+        created_at = datetime.utcnow()
+        latency_ms = latency * 1000 if latency is not None else None
+        session = self.session_factory()
+        try:
+            result = session.execute(insert(ActivityLog).values(
+                action_type=action_type,
+                status=status,
+                post_shortcode=post_shortcode,
+                latency_ms=latency_ms,
+                details=details,
+                created_at=created_at
+            ))
+            session.commit()
+            row_id = result.inserted_primary_key[0]
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error recording activity: {str(e)}")
+            return None
+        finally:
+            session.close()
+
+        row = activity_row(row_id, action_type, status, post_shortcode, latency_ms, details,
+                           created_at)
+        with self._lock:
+            self._merge([row])
+        for listener in self._listeners:
+            try:
+                listener(row)
+            except Exception as e:
+                logger.error(f"Error in activity listener: {str(e)}")
+        return row
+
+    def recent(self, limit: int = None) -> List[Dict]:
+        """Ultimele rânduri, din memorie (baza e citită doar la prima cerere)"""
+        limit = min(limit or self.tail_size, self.tail_size)
+        if self._synced_id is None:
+            self.sync()
+        with self._lock:
+            return list(self._tail)[:limit]
+
+    def sync(self) -> List[Dict]:
+        """Aduce în coadă rândurile scrise de alte procese, citite prin cheia primară
+
+        Întoarce rândurile care nu erau deja în coadă (descrescător după id);
+        la prima încărcare nu întoarce nimic, rândurile existente nu sunt noi.
+        """
+        with self._sync_lock:
+            initial = self._synced_id is None
+            # Interogarea rulează fără lock-ul cozii: recent() nu așteaptă după DB
+            rows = self._newer_than(self._synced_id or 0)
+            with self._lock:
+                if rows:
+                    self._synced_id = max(self._synced_id or 0, rows[0]['id'])
+                elif initial:
+                    self._synced_id = 0
+                new_rows = self._merge(rows)
+        return [] if initial else new_rows
+
+    def _merge(self, rows: List[Dict]) -> List[Dict]:
+        """Adaugă rândurile lipsă în coadă, păstrând ordinea descrescătoare; cu lock-ul luat"""
+        known = {row['id'] for row in self._tail}
+        new_rows = [row for row in rows if row['id'] not in known]
+        if new_rows:
+            merged = sorted([*self._tail, *new_rows], key=lambda row: row['id'], reverse=True)
+            self._tail = deque(merged[:self.tail_size], maxlen=self.tail_size)
+        return new_rows
+
+    def _newer_than(self, last_seen_id: int) -> List[Dict]:
+        session = self.session_factory()
+        try:
+            query = (session.query(ActivityLog)
+                     .filter(ActivityLog.id > last_seen_id)
+                     .order_by(ActivityLog.id.desc())
+                     .limit(self.tail_size))
+            return [
+                activity_row(entry.id, entry.action_type, entry.status, entry.post_shortcode,
+                             entry.latency_ms, entry.details, entry.created_at)
+                for entry in query
+            ]
+        finally:
+            session.close()
+
+    def page(self, before: Optional[int], limit: int) -> Dict:
+        """O pagină de istoric, în ordine descrescătoare după id, înainte de `before`"""
+        session = self.session_factory()
+        try:
+            query = session.query(ActivityLog).order_by(ActivityLog.id.desc())
+            if before is not None:
+                query = query.filter(ActivityLog.id < before)
+            items = [
+                activity_row(entry.id, entry.action_type, entry.status, entry.post_shortcode,
+                             entry.latency_ms, entry.details, entry.created_at)
+                for entry in query.limit(limit)
+            ]
+        finally:
+            session.close()
+        return {
+            "items": items,
+            "next_before": items[-1]["id"] if len(items) == limit else None
+        }
@@ -0,0 +1,295 @@
+"""Analiză vectorizată (pandas) a istoricului și export columnar (Parquet/Arrow)
+
+Exemple:
+    python -m src.utils.analytics export --days 30 --out reports/snapshot
+    python -m src.utils.analytics report --snapshot reports/snapshot
+    python -m src.utils.analytics report --days 7
+
+Datele se citesc în bucăți (read_sql cu chunksize) direct în DataFrame-uri
+tipizate: tipurile de acțiune ca `category`, timpii ca `datetime64`.
+Rapoartele pot rula dintr-un snapshot exportat, fără să citească baza live.
+Exportul cere pyarrow (dependință opțională).
+"""
+import argparse
+import importlib.util
+import json
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+from .metrics import MetricsTracker
+
+logger = logging.getLogger(__name__)
+
+ACTION_TYPES = ('like', 'comment', 'mention', 'follow', 'unfollow')
+STATUSES = ('success', 'error')
+DIRECTIONS = ('incoming', 'outgoing')
+ERROR_CATEGORIES = ('rate_limit', 'network', 'auth', 'other')
+
+QUERIES = {
+    'activity': (
+        "SELECT id, action_type, status, latency_ms, created_at FROM activity_log "
+        "WHERE created_at >= :since ORDER BY id"
+    ),
+    'interactions': (
+        "SELECT id, conversation_id, type, direction, created_at FROM interactions "
+        "WHERE created_at >= :since ORDER BY id"
+    ),
+    'conversations': (
+        "SELECT id, post_shortcode, is_active, interaction_count, last_interaction, created_at "
+        "FROM conversations WHERE last_interaction >= :since ORDER BY id"
+    ),
+}
+
+DTYPES = {
+    'activity': {
+        'id': 'int64',
+        'action_type': pd.CategoricalDtype(ACTION_TYPES),
+        'status': pd.CategoricalDtype(STATUSES),
+        'latency_ms': 'float32',
+    },
+    'interactions': {
+        'id': 'int64',
+        'conversation_id': 'int64',
+        'type': pd.CategoricalDtype(ACTION_TYPES),
+        'direction': pd.CategoricalDtype(DIRECTIONS),
+    },
+    'conversations': {
+        'id': 'int64',
+        'post_shortcode': 'string',
+        'is_active': 'bool',
+        'interaction_count': 'int32',
+    },
+}
+
+# Offset explicit la final (metrics.jsonl scrie +00:00; liniile vechi n-au offset)
+OFFSET_SUFFIX = r'(?:Z|[+-]\d{2}:?\d{2})$'
+
+DATE_COLUMNS = {
+    'activity': ['created_at'],
+    'interactions': ['created_at'],
+    'conversations': ['last_interaction', 'created_at'],
+}
+
+
+def _typed(frame: pd.DataFrame, table: str) -> pd.DataFrame:
+    for column in DATE_COLUMNS[table]:
+        frame[column] = pd.to_datetime(frame[column], format='mixed')
+    for column, dtype in DTYPES[table].items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            unknown = set(frame[column].dropna().unique()) - set(dtype.categories)
+            if unknown:
+                # Valorile necunoscute ar deveni NaN la conversie
+                logger.warning(f"Unknown {table}.{column} values ignored: {sorted(unknown)}")
+    return frame.astype(DTYPES[table])
+
+
+def _concat(chunks: Iterable[pd.DataFrame], table: str) -> pd.DataFrame:
+    frames = [_typed(chunk, table) for chunk in chunks]
+    if not frames:
+        empty = pd.DataFrame({column: pd.Series(dtype=dtype)
+                              for column, dtype in DTYPES[table].items()})
+        for column in DATE_COLUMNS[table]:
+            empty[column] = pd.Series(dtype='datetime64[ns]')
+        return empty
+    # Categoriile fixe se păstrează la concatenare (nu devin object)
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_table(table: str, since: datetime, engine=None, chunksize: int = 100_000) -> pd.DataFrame:
+    """Citește un tabel în bucăți de `chunksize` rânduri, tipizate pe măsură ce sosesc"""
+    from sqlalchemy import text
+    from ..models.db import get_engine
+
+    with (engine or get_engine()).connect() as conn:
+        chunks = pd.read_sql_query(text(QUERIES[table]), conn, chunksize=chunksize,
+                                   params={'since': since.isoformat(' ')})
+        return _concat(chunks, table)
+
+
+def _utc_timestamps(values: pd.Series) -> pd.Series:
+    """Timpi UTC fără fus orar; cei fără offset (metrics.jsonl vechi) sunt în ora locală"""
+    from dateutil.tz import tzlocal
+
+    values = values.astype('string')
+    has_offset = values.str.contains(OFFSET_SUFFIX, regex=True, na=False)
+    result = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    if has_offset.any():
+        result[has_offset] = pd.to_datetime(values[has_offset], format='ISO8601',
+                                            utc=True).dt.tz_localize(None)
+    if not has_offset.all():
+        local = pd.to_datetime(values[~has_offset], format='ISO8601')
+        result[~has_offset] = (local.dt.tz_localize(tzlocal(), ambiguous=False,
+                                                    nonexistent='shift_forward')
+                               .dt.tz_convert('UTC').dt.tz_localize(None))
+    return result
+
+
+def load_metric_events(events_file: str, since: datetime, chunksize: int = 100_000) -> pd.DataFrame:
+    """Evenimentele din metrics.jsonl; categoria erorii se calculează doar pentru eșecuri"""
+    frames = []
+    path = Path(events_file)
+    if path.exists():
+        for chunk in pd.read_json(path, lines=True, chunksize=chunksize, dtype=False,
+                                  convert_dates=False):
+            chunk['timestamp'] = _utc_timestamps(chunk['timestamp'])
+            chunk = chunk[chunk['timestamp'] >= since]
+            failed = ~chunk['success'].astype(bool)
+            error = pd.Series(pd.NA, index=chunk.index, dtype='object')
+            error[failed] = [MetricsTracker.classify_error(details or {})
+                             for details in chunk.loc[failed, 'details']]
+            frames.append(pd.DataFrame({
+                'action': chunk['action'].astype('category'),
+                'success': chunk['success'].astype(bool),
+                'timestamp': chunk['timestamp'],
+                'error': pd.Categorical(error, categories=ERROR_CATEGORIES),
+            }))
+    if not frames:
+        return pd.DataFrame({
+            'action': pd.Series(dtype='category'),
+            'success': pd.Series(dtype='bool'),
+            'timestamp': pd.Series(dtype='datetime64[ns]'),
+            'error': pd.Categorical([], categories=ERROR_CATEGORIES),
+        })
+    frame = pd.concat(frames, ignore_index=True)
+    # Concatenarea categoriilor diferite între bucăți produce object; se refac
+    frame['action'] = frame['action'].astype('category')
+    return frame
+
+
+def success_rate_by_hour(activity: pd.DataFrame) -> pd.DataFrame:
+    """Rata de succes (%) pe tip de acțiune și oră a zilei"""
+    success = (activity['status'] == 'success').astype('float32')
+    grouped = success.groupby([activity['action_type'], activity['created_at'].dt.hour],
+                              observed=True)
+    table = (grouped.mean() * 100).unstack(fill_value=float('nan'))
+    table.columns.name = 'hour'
+    return table.round(2)
+
+
+def latency_percentiles(activity: pd.DataFrame) -> pd.DataFrame:
+    """p50/p95/p99 ale latenței (ms) pe tip de acțiune"""
+    grouped = activity.groupby('action_type', observed=True)['latency_ms']
+    return grouped.quantile([0.5, 0.95, 0.99]).unstack().rename(
+        columns={0.5: 'p50', 0.95: 'p95', 0.99: 'p99'}
+    )
+
+
+def hourly_activity(conversations: pd.DataFrame, now: datetime) -> pd.DataFrame:
+    """Graficul de activitate al dashboard-ului: conversații pe oră, ultimele 24 de ore"""
+    start = pd.Timestamp(now).floor('h') - pd.Timedelta(hours=23)
+    hours = pd.date_range(start, periods=24, freq='h')
+    recent = conversations.loc[conversations['last_interaction'] >= start, 'last_interaction']
+    counts = recent.dt.floor('h').value_counts().reindex(hours, fill_value=0)
+    return pd.DataFrame({'hour': hours.strftime('%H:00'), 'interactions': counts.to_numpy()})
+
+
+def daily_summary(activity: pd.DataFrame) -> pd.DataFrame:
+    """Totaluri pe zi și tip de acțiune: reușite, eșuate, rata de succes"""
+    day = activity['created_at'].dt.floor('D').rename('day')
+    success = (activity['status'] == 'success').rename('success')
+    summary = success.groupby([day, activity['action_type']], observed=True).agg(['sum', 'count'])
+    summary.columns = ['successful', 'total']
+    summary['failed'] = summary['total'] - summary['successful']
+    summary['success_rate'] = (summary['successful'] / summary['total'] * 100).round(2)
+    return summary
+
+
+def error_distribution(events: pd.DataFrame) -> Dict[str, int]:
+    """Distribuția erorilor pe categoriile de pe dashboard"""
+    counts = events['error'].value_counts()
+    return {category: int(counts.get(category, 0)) for category in ERROR_CATEGORIES}
+
+
+def load_history(days: int, engine=None, events_file: str = 'metrics.jsonl',
+                 chunksize: int = 100_000) -> Dict[str, pd.DataFrame]:
+    since = datetime.utcnow() - timedelta(days=days)
+    frames = {table: load_table(table, since, engine, chunksize) for table in QUERIES}
+    frames['events'] = load_metric_events(events_file, since, chunksize)
+    return frames
+
+
+def _require_pyarrow():
+    if importlib.util.find_spec('pyarrow') is None:
+        raise ImportError("Parquet/Arrow export requires pyarrow (pip install pyarrow)")
+
+
+def export_snapshot(frames: Dict[str, pd.DataFrame], out_dir: Path, fmt: str = 'parquet',
+                    compression: str = 'zstd') -> Dict[str, Path]:
+    """Scrie fiecare DataFrame ca fișier Parquet sau Arrow IPC (Feather v2) comprimat"""
+    _require_pyarrow()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = {}
+    for name, frame in frames.items():
+        if fmt == 'parquet':
+            path = out_dir / f'{name}.parquet'
+            frame.to_parquet(path, compression=compression, index=False)
+        else:
+            path = out_dir / f'{name}.arrow'
+            frame.reset_index(drop=True).to_feather(path, compression=compression)
+        written[name] = path
+    (out_dir / 'manifest.json').write_text(json.dumps({
+        'created_at': datetime.utcnow().isoformat(),
+        'format': fmt,
+        'tables': {name: {'file': path.name, 'rows': len(frames[name])}
+                   for name, path in written.items()},
+    }, indent=2))
+    return written
+
+
+def load_snapshot(snapshot_dir: Path) -> Dict[str, pd.DataFrame]:
+    """Încarcă un snapshot exportat; tipurile (category, datetime64) se păstrează"""
+    _require_pyarrow()
+    snapshot_dir = Path(snapshot_dir)
+    manifest = json.loads((snapshot_dir / 'manifest.json').read_text())
+    reader = pd.read_parquet if manifest['format'] == 'parquet' else pd.read_feather
+    return {name: reader(snapshot_dir / table['file'])
+            for name, table in manifest['tables'].items()}
+
+
+def report(frames: Dict[str, pd.DataFrame], now: Optional[datetime] = None) -> Dict:
+    now = now or datetime.utcnow()
+    activity = frames['activity']
+    return {
+        'success_rate_by_hour': success_rate_by_hour(activity),
+        'latency_ms': latency_percentiles(activity),
+        'daily': daily_summary(activity),
+        'hourly_activity': hourly_activity(frames['conversations'], now),
+        'errors': error_distribution(frames['events']),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('command', choices=['export', 'report'])
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--events-file', default='metrics.jsonl')
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--out', type=Path, help='directorul snapshot-ului (export)')
+    parser.add_argument('--format', choices=['parquet', 'arrow'], default='parquet')
+    parser.add_argument('--snapshot', type=Path, help='raport dintr-un snapshot, fără DB')
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        if not args.out:
+            parser.error('export requires --out')
+        frames = load_history(args.days, events_file=args.events_file, chunksize=args.chunksize)
+        for name, path in export_snapshot(frames, args.out, args.format).items():
+            print(f"{name:<14} {len(frames[name]):>10} rows -> {path}")
+        return
+
+    frames = (load_snapshot(args.snapshot) if args.snapshot else
+              load_history(args.days, events_file=args.events_file, chunksize=args.chunksize))
+    result = report(frames)
+    with pd.option_context('display.width', 200, 'display.max_columns', 30):
+        for name, value in result.items():
+            print(f"\n== {name} ==")
+            print(value)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,35 +1,217 @@
+import random
+import sys
+import threading
 import time
 import logging
 from functools import wraps
-from typing import Callable, Any, Dict
-from requests.exceptions import RequestException
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
 from ..utils.metrics import MetricsTracker
 
+if TYPE_CHECKING:
+    from requests.exceptions import RequestException
+
 logger = logging.getLogger(__name__)
 
+def get_status_code(error: Exception) -> Optional[int]:
+    """Codul HTTP real al erorii (None pentru erori de rețea)"""
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+def is_endpoint_failure(status_code: Optional[int]) -> bool:
+    """Răspunsurile care indică un endpoint căzut sau supraîncărcat"""
+    return status_code is not None and (status_code == 429 or 500 <= status_code < 600)
+
+def is_network_error(error: Exception) -> bool:
+    """Eroare de rețea: RequestException fără răspuns (timeout, conexiune refuzată...)"""
+    # Dacă requests nu e încărcat, eroarea nu poate veni din requests
+    requests = sys.modules.get('requests')
+    return (requests is not None and isinstance(error, requests.RequestException)
+            and getattr(error, 'response', None) is None)
+
+def is_retryable(error: Exception) -> bool:
+    """Erorile endpoint-ului (429, 5xx, rețea); erorile de program nu se reîncearcă"""
+    return is_endpoint_failure(get_status_code(error)) or is_network_error(error)
+
+
+class CircuitOpenError(Exception):
+    """Circuitul endpoint-ului e deschis; request-ul nu a fost trimis"""
+
+    def __init__(self, endpoint: str, retry_after: float):
+        super().__init__(f"Circuit open for {endpoint}, retry in {retry_after:.0f}s")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Circuit per endpoint: closed -> open după eșecuri repetate -> half_open (un singur test)"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, endpoint: str, failure_threshold: int = 5, base_delay: float = 5.0,
+                 max_delay: float = 300.0, on_transition: Callable = None):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.on_transition = on_transition
+        self.state = self.CLOSED
+        self.failures = 0
+        self.open_count = 0
+        self.retry_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def backoff(self, attempt: int) -> float:
+        """Backoff exponențial cu jitter: jumătate fix, jumătate aleator"""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def retry_after(self) -> float:
+        return max(0.0, self.retry_at - time.monotonic())
+
+    def allow(self) -> bool:
+        """True dacă request-ul poate fi trimis acum"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() < self.retry_at:
+                    return False
+                self._transition(self.HALF_OPEN)
+            # Half-open: un singur request de test la un moment dat
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._probe_in_flight = False
+            self.failures = 0
+            self.open_count = 0
+            if self.state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def record_failure(self, retry_after: float = None):
+        with self._lock:
+            self._probe_in_flight = False
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                delay = self.backoff(self.open_count)
+                if retry_after:
+                    delay = max(delay, retry_after)
+                self.open_count += 1
+                self.retry_at = time.monotonic() + delay
+                self._transition(self.OPEN)
+
+    def record_ignored(self):
+        """Eroare care nu ține de endpoint (ex. 401/404): doar eliberează testul"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        previous, self.state = self.state, state
+        logger.warning(f"Circuit for {self.endpoint}: {previous} -> {state}")
+        if self.on_transition:
+            try:
+                self.on_transition(self.endpoint, previous, state)
+            except Exception as e:
+                logger.error(f"Error reporting circuit transition: {str(e)}")
+
+
+class CircuitBreakerRegistry:
+    """Circuitele partajate de toți apelanții din proces, câte unul per endpoint"""
+
+    def __init__(self, **breaker_options):
+        self.breaker_options = breaker_options
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._listeners: List[Callable] = []
+        self._lock = threading.Lock()
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(endpoint)
+                if breaker is None:
+                    breaker = self._breakers[endpoint] = CircuitBreaker(
+                        endpoint, on_transition=self._notify, **self.breaker_options
+                    )
+        return breaker
+
+    def add_listener(self, callback: Callable):
+        """callback(endpoint, previous_state, new_state) la fiecare tranziție"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def states(self) -> Dict[str, str]:
+        return {endpoint: breaker.state for endpoint, breaker in self._breakers.items()}
+
+    def _notify(self, endpoint: str, previous: str, state: str):
+        for listener in self._listeners:
+            listener(endpoint, previous, state)
+
+
+BREAKERS = CircuitBreakerRegistry()
+
+
 class ErrorHandler:
-    def __init__(self, metrics: MetricsTracker):
+    def __init__(self, metrics: MetricsTracker, action_queue=None,
+                 breakers: CircuitBreakerRegistry = BREAKERS):
         self.metrics = metrics
+        self.action_queue = action_queue
+        self.breakers = breakers
         self.max_retries = 3
-        self.retry_delay = 5  # secunde
-        
+        self.breakers.add_listener(self._report_transition)
+
+    def close(self):
+        """Dezabonează handler-ul de la registrul de circuite (partajat de proces)"""
+        self.breakers.remove_listener(self._report_transition)
+
+    def _report_transition(self, endpoint: str, previous: str, state: str):
+        # Tranzițiile circuitelor apar ca și contoare în /metrics
+        self.metrics.increment(f"circuit_{state}:{endpoint}")
+
     def with_retry(self, func: Callable) -> Callable:
-        """Decorator pentru reîncercarea funcțiilor eșuate"""
+        """Decorator pentru reîncercarea funcțiilor eșuate, cu circuit breaker per funcție"""
+        breaker = self.breakers.get(func.__qualname__)
+
         @wraps(func)
         def wrapper(*args, **kwargs):
             last_error = None
             for attempt in range(self.max_retries):
+                # Cât timp circuitul e deschis, eșuează imediat, fără request
+                if not breaker.allow():
+                    raise CircuitOpenError(breaker.endpoint, breaker.retry_after())
                 try:
                     result = func(*args, **kwargs)
+                    breaker.record_success()
                     # Înregistrează succes în metrici
                     self.metrics.track_action(
-                        func.__name__, 
+                        func.__name__,
                         success=True,
                         details={'attempt': attempt + 1}
                     )
                     return result
+                except CircuitOpenError:
+                    # Circuitul unui request interior e deschis: nu e un eșec al acestui apel
+                    breaker.record_ignored()
+                    raise
                 except Exception as e:
                     last_error = e
+                    status_code = get_status_code(e)
+                    retryable = is_retryable(e)
+                    if retryable:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_ignored()
                     logger.warning(
                         f"Attempt {attempt + 1}/{self.max_retries} "
                         f"failed for {func.__name__}: {str(e)}"
@@ -40,45 +222,52 @@ class ErrorHandler:
                         success=False,
                         details={
                             'attempt': attempt + 1,
-                            'error': str(e)
+                            'error': str(e),
+                            'status_code': status_code
                         }
                     )
+                    # Erorile de client (401, 404...) și cele de program nu se rezolvă prin reîncercare
+                    if not retryable or breaker.state != CircuitBreaker.CLOSED:
+                        break
                     if attempt < self.max_retries - 1:
-                        time.sleep(self.retry_delay * (attempt + 1))
-            
+                        time.sleep(breaker.backoff(attempt))
+
             raise last_error
         return wrapper
-        
-    def handle_request_error(self, error: RequestException) -> Dict:
-        """Gestionează erorile de request"""
+
+    def handle_request_error(self, error: 'RequestException') -> Dict:
+        """Gestionează erorile de request, după codul HTTP real"""
         error_type = type(error).__name__
         error_msg = str(error)
-        
-        if "429" in error_msg:
+        status_code = get_status_code(error)
+
+        if status_code == 429:
             logger.warning("Rate limit reached. Backing off...")
-            time.sleep(30)  # Așteaptă 30 secunde
+            # Amână coada de acțiuni în loc să blocheze thread-ul curent
+            if self.action_queue:
+                self.action_queue.pause(30)
             return {
                 "status": "retry",
                 "message": "Rate limit reached",
                 "wait_time": 30
             }
-            
-        elif "401" in error_msg or "403" in error_msg:
+
+        elif status_code in (401, 403):
             logger.error("Authentication error. Cookie-urile ar putea fi expirate.")
             return {
                 "status": "fatal",
                 "message": "Authentication failed",
                 "action": "refresh_cookies"
             }
-            
-        elif "5" in str(error.response.status_code):
+
+        elif status_code is not None and 500 <= status_code < 600:
             logger.error(f"Server error: {error_msg}")
             return {
                 "status": "retry",
                 "message": "Server error",
                 "wait_time": 60
             }
-            
+
         else:
             logger.error(f"Unhandled error: {error_type} - {error_msg}")
             return {
@@ -86,22 +275,22 @@ class ErrorHandler:
                 "message": error_msg,
                 "error_type": error_type
             }
-            
+
     def recover_session(self, instagram_service) -> bool:
         """Încearcă să recupereze sesiunea"""
         try:
             # Reînnoiește cookie-urile
             instagram_service.refresh_cookies()
-            
+
             # Verifică dacă sesiunea e validă
             test_response = instagram_service.test_connection()
             if test_response.ok:
                 logger.info("Session recovered successfully")
                 return True
-                
+
             logger.error("Failed to recover session")
             return False
-            
+
         except Exception as e:
             logger.error(f"Error during session recovery: {str(e)}")
-            return False
\ No newline at end of file
+            return False
@@ -0,0 +1,160 @@
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Dict, List, Optional, Tuple
+
+def log_linear_bounds(min_exponent: int = -5, max_exponent: int = 2) -> Tuple[float, ...]:
+    """Limite log-liniare: 1..9 x 10^k pentru fiecare decadă (10us .. 900s implicit)"""
+    return tuple(
+        round(step * 10.0 ** exponent, 12)
+        for exponent in range(min_exponent, max_exponent + 1)
+        for step in range(1, 10)
+    )
+
+DEFAULT_BOUNDS = log_linear_bounds()
+
+
+class Histogram:
+    """Histogramă cu bucket-uri fixe; fiecare thread scrie în propriul shard
+
+    observe() nu ia niciun lock: shard-ul thread-ului curent are un singur
+    scriitor. Citirile însumează shard-urile și pot fi cu o observație în urmă.
+    """
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BOUNDS):
+        self.bounds = bounds
+        self._local = threading.local()
+        self._shards: List[list] = []
+        self._shards_lock = threading.Lock()
+
+    def _new_shard(self) -> list:
+        # [contoare per bucket (+Inf la final), suma]
+        shard = [[0] * (len(self.bounds) + 1), 0.0]
+        with self._shards_lock:
+            self._shards.append(shard)
+        self._local.shard = shard
+        return shard
+
+    def observe(self, value: float):
+        shard = getattr(self._local, 'shard', None) or self._new_shard()
+        shard[0][bisect_left(self.bounds, value)] += 1
+        shard[1] += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        """Contoarele (necumulative) și suma, agregate din toate shard-urile"""
+        counts = [0] * (len(self.bounds) + 1)
+        total = 0.0
+        for shard_counts, shard_sum in list(self._shards):
+            for i, count in enumerate(shard_counts):
+                counts[i] += count
+            total += shard_sum
+        return counts, total
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Limita superioară a bucket-ului care conține percentila cerută"""
+        counts, _ = self.snapshot()
+        total = sum(counts)
+        if not total:
+            return None
+        rank = pct / 100 * total
+        seen = 0
+        for i, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                return self.bounds[i] if i < len(self.bounds) else float('inf')
+        return float('inf')
+
+
+class HistogramFamily:
+    """Histograme cu același nume, diferențiate prin etichete"""
+
+    def __init__(self, name: str, help_text: str, bounds: Tuple[float, ...] = DEFAULT_BOUNDS):
+        self.name = name
+        self.help_text = help_text
+        self.bounds = bounds
+        self._children: Dict[Tuple, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels) -> Histogram:
+        key = tuple(sorted(labels.items()))
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, Histogram(self.bounds))
+        return child
+
+    def observe(self, value: float, **labels):
+        self.labels(**labels).observe(value)
+
+    def render(self) -> List[str]:
+        """Formatul text Prometheus (bucket-uri cumulative, _sum, _count)"""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, child in sorted(self._children.items()):
+            counts, total = child.snapshot()
+            label_text = ','.join(f'{k}="{_escape(v)}"' for k, v in key)
+            prefix = label_text + ',' if label_text else ''
+            cumulative = 0
+            for bound, count in zip(child.bounds, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound:g}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {cumulative}')
+            suffix = f'{{{label_text}}}' if label_text else ''
+            lines.append(f'{self.name}_sum{suffix} {total}')
+            lines.append(f'{self.name}_count{suffix} {cumulative}')
+        return lines
+
+
+class HistogramRegistry:
+    def __init__(self):
+        self._families: Dict[str, HistogramFamily] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, help_text: str = '') -> HistogramFamily:
+        family = self._families.get(name)
+        if family is None:
+            with self._lock:
+                family = self._families.setdefault(name, HistogramFamily(name, help_text))
+        return family
+
+    def render(self) -> str:
+        lines = []
+        for name in sorted(self._families):
+            lines.extend(self._families[name].render())
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REGISTRY = HistogramRegistry()
+
+
+class timed:
+    """Măsoară durata unui apel; se folosește ca decorator sau context manager"""
+
+    def __init__(self, name: str, help_text: str = '', registry: HistogramRegistry = None,
+                 **labels):
+        self.histogram = (registry or REGISTRY).histogram(name, help_text).labels(**labels)
+
+    def __call__(self, func):
+        histogram = self.histogram
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return wrapper
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self._start)
+        return False
@@ -0,0 +1,160 @@
+"""Interogări offline peste logurile JSON-lines (general.jsonl și rotațiile lui)
+
+Exemple:
+    python -m src.utils.log_query latency --hours 6
+    python -m src.utils.log_query levels --hours 24 --log-dir logs
+
+Pentru fiecare segment se păstrează în `.jsonl_index.json` intervalul de timp
+și numărul de record-uri pe nivel, astfel încât segmentele din afara
+ferestrei cerute nu mai sunt citite deloc.
+"""
+import argparse
+import json
+import math
+import os
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+INDEX_FILE = '.jsonl_index.json'
+
+
+def _signature(stat: os.stat_result) -> str:
+    # Rotația redenumește fișierele, deci intrările sunt identificate după inode
+    return f"{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _read_entries(path: Path) -> Iterator[Dict]:
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def _scan_segment(path: Path) -> Dict:
+    first_ts = last_ts = None
+    levels = Counter()
+    events = Counter()
+    for entry in _read_entries(path):
+        ts = entry.get('ts')
+        if ts is None:
+            continue
+        first_ts = ts if first_ts is None else min(first_ts, ts)
+        last_ts = ts if last_ts is None else max(last_ts, ts)
+        levels[entry.get('level', 'UNKNOWN')] += 1
+        events[entry.get('event', 'log')] += 1
+    return {'first_ts': first_ts, 'last_ts': last_ts,
+            'levels': dict(levels), 'events': dict(events)}
+
+
+def build_index(log_dir: Path, pattern: str = 'general.jsonl*') -> Dict[str, Dict]:
+    """Actualizează indexul; doar segmentele noi sau modificate sunt rescanate"""
+    index_path = log_dir / INDEX_FILE
+    try:
+        cached = json.loads(index_path.read_text())
+    except (OSError, ValueError):
+        cached = {}
+
+    index = {}
+    segments = {}
+    for path in sorted(log_dir.glob(pattern)):
+        signature = _signature(path.stat())
+        entry = cached.get(signature) or _scan_segment(path)
+        index[signature] = entry
+        segments[str(path)] = entry
+
+    tmp_path = index_path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(index))
+    os.replace(tmp_path, index_path)
+    return segments
+
+
+def segments_since(log_dir: Path, since: float) -> List[Path]:
+    """Segmentele care pot conține record-uri mai noi de `since`"""
+    return [
+        Path(path) for path, entry in build_index(log_dir).items()
+        if entry['last_ts'] is not None and entry['last_ts'] >= since
+    ]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    rank = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+def latency_by_endpoint(log_dir: Path, hours: float) -> List[Dict]:
+    """p50/p95/p99 ale duratei request-urilor (ms), grupate pe metodă și URL template"""
+    since = time.time() - hours * 3600
+    durations = defaultdict(list)
+    errors = Counter()
+    for path in segments_since(log_dir, since):
+        for entry in _read_entries(path):
+            if entry.get('event') != 'request' or entry.get('ts', 0) < since:
+                continue
+            endpoint = f"{entry.get('method')} {entry.get('url_template')}"
+            durations[endpoint].append(float(entry.get('elapsed_ms', 0.0)))
+            if int(entry.get('status', 0)) >= 400:
+                errors[endpoint] += 1
+
+    rows = []
+    for endpoint, values in durations.items():
+        values.sort()
+        rows.append({
+            'endpoint': endpoint,
+            'count': len(values),
+            'errors': errors[endpoint],
+            'p50': percentile(values, 50),
+            'p95': percentile(values, 95),
+            'p99': percentile(values, 99),
+        })
+    return sorted(rows, key=lambda row: row['p95'], reverse=True)
+
+
+def level_counts(log_dir: Path, hours: float) -> Dict[str, int]:
+    """Numărul de record-uri pe nivel; segmentele complet în fereastră vin din index"""
+    since = time.time() - hours * 3600
+    totals = Counter()
+    for path, entry in build_index(log_dir).items():
+        if entry['last_ts'] is None or entry['last_ts'] < since:
+            continue
+        if entry['first_ts'] >= since:
+            totals.update(entry['levels'])
+            continue
+        for record in _read_entries(Path(path)):
+            if record.get('ts', 0) >= since:
+                totals[record.get('level', 'UNKNOWN')] += 1
+    return dict(totals)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('command', choices=['latency', 'levels'])
+    parser.add_argument('--hours', type=float, default=24)
+    parser.add_argument('--log-dir', type=Path, default=Path('logs'))
+    parser.add_argument('--json', action='store_true', help='rezultatul ca JSON')
+    args = parser.parse_args(argv)
+
+    if args.command == 'latency':
+        result = latency_by_endpoint(args.log_dir, args.hours)
+        if args.json:
+            print(json.dumps(result, indent=2))
+            return
+        print(f"{'endpoint':<40} {'count':>7} {'errors':>7} "
+              f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for row in result:
+            print(f"{row['endpoint']:<40} {row['count']:>7} {row['errors']:>7} "
+                  f"{row['p50']:>8.1f} {row['p95']:>8.1f} {row['p99']:>8.1f}")
+    else:
+        result = level_counts(args.log_dir, args.hours)
+        if args.json:
+            print(json.dumps(result, indent=2))
+            return
+        for level, count in sorted(result.items()):
+            print(f"{level:<10} {count:>8}")
+
+
+if __name__ == '__main__':
+    main()
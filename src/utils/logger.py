@@ -1,113 +1,293 @@
+import atexit
+import json
 import logging
+import queue
+import re
 import sys
-from logging.handlers import RotatingFileHandler
+import time
+from urllib.parse import urlsplit
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
+
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler care face flush pe lot, nu după fiecare record"""
+
+    def __init__(self, *args, flush_interval: float = 1.0, flush_records: int = 200, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.flush_interval = flush_interval
+        self.flush_records = flush_records
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        # Apelat de StreamHandler.emit după fiecare record
+        self._unflushed += 1
+        if (self._unflushed >= self.flush_records or
+                time.monotonic() - self._last_flush >= self.flush_interval):
+            self.force_flush()
+
+    def force_flush(self):
+        super().flush()
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.force_flush()
+        super().close()
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Pune record-urile în coadă fără a le formata pe thread-ul apelant
+
+    Când coada e plină, record-urile DEBUG/INFO sunt aruncate imediat, iar
+    WARNING și peste așteaptă cel mult `block_timeout` secunde un loc liber.
+    Record-urile pierdute sunt numărate în `dropped`.
+    """
+
+    def __init__(self, log_queue: queue.Queue, block_timeout: float = 1.0):
+        super().__init__(log_queue)
+        self.block_timeout = block_timeout
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Coada e în proces, deci mesajul se formatează abia în listener
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno < logging.WARNING:
+                self.dropped += 1
+                return
+            try:
+                self.queue.put(record, timeout=self.block_timeout)
+            except queue.Full:
+                self.dropped += 1
+
+
+class FlushingQueueListener(QueueListener):
+    """QueueListener care golește periodic buffer-ele handler-elor când e inactiv"""
+
+    def __init__(self, log_queue: queue.Queue, *handlers, flush_interval: float = 1.0):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+
+    def dequeue(self, block: bool):
+        while True:
+            try:
+                return self.queue.get(block=block, timeout=self.flush_interval)
+            except queue.Empty:
+                if not block:
+                    raise
+                self.flush_handlers()
+
+    def flush_handlers(self):
+        for handler in self.handlers:
+            if isinstance(handler, BufferedRotatingFileHandler):
+                handler.force_flush()
+            else:
+                handler.flush()
+
+
+_URL_TEMPLATE_RULES = [
+    (re.compile(r'^/p/[^/]+'), '/p/{shortcode}'),
+    (re.compile(r'/\d+(?=/|$)'), '/{id}'),
+]
+
+def url_template(url: str) -> str:
+    """Înlocuiește id-urile din URL cu placeholder-e (ex. /web/likes/{id}/like/)"""
+    path = urlsplit(url).path or url
+    for pattern, replacement in _URL_TEMPLATE_RULES:
+        path = pattern.sub(replacement, path)
+    return path
+
+
+def log_request(log: logging.Logger, method: str, url: str, status_code: int, elapsed: float):
+    """Record-ul `event: request` citit de log_query (latency); nivelul după status"""
+    if status_code >= 500:
+        level = logging.ERROR
+    elif status_code >= 400:
+        level = logging.WARNING
+    else:
+        level = logging.INFO
+
+    if log.isEnabledFor(level):
+        fields = {'event': 'request', 'method': method, 'host': urlsplit(url).hostname,
+                  'url_template': url_template(url), 'status': status_code,
+                  'elapsed_ms': round(elapsed * 1000, 3)}
+        log.log(level, "Request: %s %s - Status: %s - Time: %.1fms",
+                method, url, status_code, elapsed * 1000, extra={'fields': fields})
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Un obiect JSON pe linie; câmpurile tipizate vin din extra={'fields': {...}}"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 6),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
 
 class CustomLogger:
-    def __init__(self, name: str, log_dir: str = "logs"):
+    def __init__(self, name: str, log_dir: str = "logs", queue_size: int = 10000,
+                 flush_interval: float = 1.0, json_lines: bool = False):
         self.name = name
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(exist_ok=True)
-        
+        self.flush_interval = flush_interval
+
         # Configurare logger principal
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.DEBUG)
-        
+
         # Format pentru logging
         formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
-        
+
         # Handler pentru fișierul general
-        general_handler = RotatingFileHandler(
+        general_handler = BufferedRotatingFileHandler(
             self.log_dir / "general.log",
             maxBytes=5*1024*1024,  # 5MB
-            backupCount=5
+            backupCount=5,
+            flush_interval=flush_interval
         )
         general_handler.setLevel(logging.INFO)
         general_handler.setFormatter(formatter)
-        
+
         # Handler pentru erori
-        error_handler = RotatingFileHandler(
+        error_handler = BufferedRotatingFileHandler(
             self.log_dir / "errors.log",
             maxBytes=5*1024*1024,
-            backupCount=5
+            backupCount=5,
+            flush_interval=flush_interval
         )
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(formatter)
-        
+
         # Handler pentru debug
-        debug_handler = RotatingFileHandler(
+        debug_handler = BufferedRotatingFileHandler(
             self.log_dir / "debug.log",
             maxBytes=10*1024*1024,  # 10MB
-            backupCount=3
+            backupCount=3,
+            flush_interval=flush_interval
         )
         debug_handler.setLevel(logging.DEBUG)
         debug_handler.setFormatter(formatter)
-        
+
         # Handler pentru consolă
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(logging.INFO)
         console_handler.setFormatter(formatter)
-        
-        # Adaugă handlere la logger
-        self.logger.addHandler(general_handler)
-        self.logger.addHandler(error_handler)
-        self.logger.addHandler(debug_handler)
-        self.logger.addHandler(console_handler)
-        
+
+        # Handler-ele rulează pe un singur thread de fundal; apelantul doar pune în coadă
+        self.handlers = [general_handler, error_handler, debug_handler, console_handler]
+
+        # Mod structurat: general.jsonl, interogabil cu src.utils.log_query
+        if json_lines:
+            json_handler = BufferedRotatingFileHandler(
+                self.log_dir / "general.jsonl",
+                maxBytes=5*1024*1024,
+                backupCount=5,
+                flush_interval=flush_interval
+            )
+            json_handler.setLevel(logging.INFO)
+            json_handler.setFormatter(JsonLinesFormatter())
+            self.handlers.append(json_handler)
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.queue_handler = DroppingQueueHandler(self.queue)
+        self.listener = None
+        self._start_listener()
+
+        for handler in list(self.logger.handlers):
+            if isinstance(handler, DroppingQueueHandler):
+                self.logger.removeHandler(handler)
+        self.logger.addHandler(self.queue_handler)
+        atexit.register(self.stop)
+
+    def _start_listener(self):
+        self.listener = FlushingQueueListener(
+            self.queue, *self.handlers, flush_interval=self.flush_interval
+        )
+        self.listener.start()
+
+    def stop(self):
+        """Golește coada, scrie tot pe disc și oprește thread-ul de fundal"""
+        if self.listener is None:
+            return
+        self.listener.stop()
+        self.listener.flush_handlers()
+        self.listener = None
+        if self.queue_handler.dropped:
+            sys.stderr.write(
+                f"{self.name}: {self.queue_handler.dropped} log records dropped (queue full)\n"
+            )
+
     def log_action(self, action_type: str, status: str, details: dict = None):
         """Logger specializat pentru acțiuni"""
-        msg = f"Action: {action_type} - Status: {status}"
-        if details:
-            msg += f" - Details: {details}"
-            
         if status == "success":
-            self.logger.info(msg)
+            level = logging.INFO
         elif status == "error":
-            self.logger.error(msg)
+            level = logging.ERROR
+        else:
+            level = logging.DEBUG
+
+        # Mesajul se construiește doar dacă nivelul e activ, și abia în listener
+        if not self.logger.isEnabledFor(level):
+            return
+        fields = {'event': 'action', 'action': action_type, 'status': status,
+                  'details': details or {}}
+        if details:
+            self.logger.log(level, "Action: %s - Status: %s - Details: %s",
+                            action_type, status, details, extra={'fields': fields})
         else:
-            self.logger.debug(msg)
-            
-    def log_request(self, method: str, url: str, status_code: int, 
+            self.logger.log(level, "Action: %s - Status: %s", action_type, status,
+                            extra={'fields': fields})
+
+    def log_request(self, method: str, url: str, status_code: int,
                    response_time: float):
         """Logger specializat pentru request-uri"""
-        msg = f"Request: {method} {url} - Status: {status_code} - Time: {response_time:.2f}s"
-        
-        if status_code >= 500:
-            self.logger.error(msg)
-        elif status_code >= 400:
-            self.logger.warning(msg)
-        else:
-            self.logger.info(msg)
-            
+        log_request(self.logger, method, url, status_code, response_time)
+
     def log_error(self, error: Exception, context: dict = None):
         """Logger specializat pentru erori"""
-        msg = f"Error: {str(error)}"
         if context:
-            msg += f" - Context: {context}"
-            
-        self.logger.exception(msg)
-        
+            self.logger.exception("Error: %s - Context: %s", error, context)
+        else:
+            self.logger.exception("Error: %s", error)
+
     def create_session_log(self):
         """Creează un nou fișier de log pentru sesiunea curentă"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         session_log = self.log_dir / f"session_{timestamp}.log"
-        
+
         handler = logging.FileHandler(session_log)
         handler.setLevel(logging.DEBUG)
         handler.setFormatter(logging.Formatter(
             '%(asctime)s - %(levelname)s - %(message)s'
         ))
-        
-        self.logger.addHandler(handler)
+
+        # Listener-ul are o listă fixă de handler-e, deci se repornește
+        self.handlers.append(handler)
+        if self.listener:
+            self.listener.stop()
+            self._start_listener()
         return session_log
-        
+
     def clean_old_logs(self, days: int = 7):
         """Șterge logurile mai vechi de X zile"""
         cutoff = datetime.now() - timedelta(days=days)
-        
+
         for log_file in self.log_dir.glob("*.log.*"):
             if log_file.stat().st_mtime < cutoff.timestamp():
-                log_file.unlink()
\ No newline at end of file
+                log_file.unlink()
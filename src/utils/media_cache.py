@@ -0,0 +1,75 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from ..models.media_id import MediaIdMapping
+
+logger = logging.getLogger(__name__)
+
+class MediaIdCache:
+    """Cache pe două niveluri shortcode -> media_id: LRU cu TTL în memorie + tabel persistent"""
+
+    def __init__(self, session_factory: Callable, max_size: int = 2048,
+                 ttl: float = 6 * 3600, metrics=None):
+        self.session_factory = session_factory
+        self.max_size = max_size
+        self.ttl = ttl
+        self.metrics = metrics
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _count(self, name: str):
+        if self.metrics:
+            self.metrics.increment(name)
+
+    def get(self, shortcode: str) -> Optional[str]:
+        """Caută întâi în memorie, apoi în baza de date"""
+        with self._lock:
+            entry = self._entries.get(shortcode)
+            if entry is not None:
+                media_id, expires_at = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(shortcode)
+                    self._count('media_id_cache_memory_hits')
+                    return media_id
+                del self._entries[shortcode]
+
+        session = self.session_factory()
+        try:
+            mapping = session.get(MediaIdMapping, shortcode)
+            media_id = mapping.media_id if mapping else None
+        except Exception as e:
+            logger.error(f"Error reading media_id cache: {str(e)}")
+            media_id = None
+        finally:
+            session.close()
+
+        if media_id is None:
+            self._count('media_id_cache_misses')
+            return None
+
+        self._count('media_id_cache_db_hits')
+        self._remember(shortcode, media_id)
+        return media_id
+
+    def set(self, shortcode: str, media_id: str):
+        """Salvează maparea în ambele niveluri"""
+        self._remember(shortcode, media_id)
+        session = self.session_factory()
+        try:
+            session.merge(MediaIdMapping(post_shortcode=shortcode, media_id=media_id))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error saving media_id cache: {str(e)}")
+        finally:
+            session.close()
+
+    def _remember(self, shortcode: str, media_id: str):
+        with self._lock:
+            self._entries[shortcode] = (media_id, time.monotonic() + self.ttl)
+            self._entries.move_to_end(shortcode)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
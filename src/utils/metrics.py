@@ -1,73 +1,290 @@
+import atexit
+import itertools
 import logging
 import json
-from datetime import datetime, timedelta
-from typing import Dict, List
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Deque, Dict, Hashable, List
 from pathlib import Path
 
+DAILY_STAT_KEYS = (
+    'likes', 'comments', 'follows', 'unfollows', 'errors',
+    'successful_requests', 'failed_requests',
+    'rate_limit_errors', 'network_errors', 'auth_errors', 'other_errors'
+)
+
+class StripedCounters:
+    """Contoare împărțite pe benzi, fiecare cu lock-ul ei
+
+    Fiecare thread primește o bandă fixă (round-robin), deci lock-urile sunt
+    practic necontestate. Citirea copiază benzile fără lock și nu blochează
+    niciodată scriitorii.
+    """
+
+    def __init__(self, stripes: int = 16):
+        self._stripes = [(threading.Lock(), {}) for _ in range(stripes)]
+        self._next_stripe = itertools.count()
+        self._local = threading.local()
+
+    def add(self, key: Hashable, amount: int = 1):
+        stripe = getattr(self._local, 'stripe', None)
+        if stripe is None:
+            stripe = self._local.stripe = self._stripes[next(self._next_stripe) % len(self._stripes)]
+        lock, values = stripe
+        with lock:
+            values[key] = values.get(key, 0) + amount
+
+    def snapshot(self) -> Dict[Hashable, int]:
+        totals: Dict[Hashable, int] = {}
+        for _, values in self._stripes:
+            for key, value in values.copy().items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
 class MetricsTracker:
-    def __init__(self, metrics_file: str = "metrics.json"):
+    def __init__(self, metrics_file: str = "metrics.json", max_recent: int = 1000,
+                 batch_size: int = 100, flush_interval: float = 5.0, rollups=None):
+        # metrics_file păstrează doar contoarele; evenimentele merg în jurnalul .jsonl
         self.metrics_file = metrics_file
-        self.metrics = self._load_metrics()
-        self.daily_stats = {
-            'likes': 0,
-            'comments': 0,
-            'follows': 0,
-            'unfollows': 0,
-            'errors': 0,
-            'successful_requests': 0,
-            'failed_requests': 0
-        }
-        
-    def _load_metrics(self) -> Dict:
+        self.events_file = str(Path(metrics_file).with_suffix('.jsonl'))
+        self.max_recent = max_recent
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rollups = rollups
+
+        # Sigur pentru thread-uri: deque-urile sunt atomice, contoarele sunt pe benzi
+        self.metrics: Dict[str, Deque[Dict]] = {}
+        self._totals = StripedCounters()
+        self._daily = StripedCounters()
+        self._daily_offset: Dict[Hashable, int] = {}
+        self._counters = StripedCounters()
+        self._pending: Deque[Dict] = deque()
+        # Contoarele consistente cu offset-ul din jurnal (actualizate doar la flush)
+        self._persisted: Dict[str, Dict[str, int]] = {}
+        self._flush_lock = threading.Lock()
+        self._offset = 0
+        self._last_flush = time.monotonic()
+        self._load_metrics()
+
+        self._listeners: List[Callable] = []
+        atexit.register(self.save_metrics, True)
+
+    @property
+    def totals(self) -> Dict[str, Dict[str, int]]:
+        totals: Dict[str, Dict[str, int]] = {}
+        for (action_type, result), count in self._totals.snapshot().items():
+            totals.setdefault(action_type, {'success': 0, 'failure': 0})[result] = count
+        return totals
+
+    @property
+    def daily_stats(self) -> Dict[str, int]:
+        current = self._daily.snapshot()
+        return {key: current.get(key, 0) - self._daily_offset.get(key, 0)
+                for key in DAILY_STAT_KEYS}
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        return self._counters.snapshot()
+
+    def _load_metrics(self):
+        """Încarcă contoarele și doar fereastra recentă din jurnal"""
         try:
             if Path(self.metrics_file).exists():
                 with open(self.metrics_file, 'r') as f:
-                    return json.load(f)
-            return {}
+                    snapshot = json.load(f)
+                if snapshot and all(isinstance(v, list) for v in snapshot.values()):
+                    self._migrate_legacy(snapshot)
+                else:
+                    for action_type, counters in snapshot.get('totals', {}).items():
+                        for result, count in counters.items():
+                            self._totals.add((action_type, result), count)
+                    self._persisted = snapshot.get('totals', {})
+                    self._offset = snapshot.get('offset', 0)
+
+            if not Path(self.events_file).exists():
+                return
+
+            # Evenimentele scrise după ultimul snapshot (ex. crash între scrieri)
+            with open(self.events_file, 'r') as f:
+                f.seek(self._offset)
+                for line in f:
+                    event = self._parse_event(line)
+                    if event:
+                        self._count(event['action'], event['success'])
+                        self._persist_count(event['action'], event['success'])
+                self._offset = f.tell()
+
+            max_lines = self.max_recent * max(len(self.totals), 1)
+            for line in self._read_tail(self.events_file, max_lines):
+                event = self._parse_event(line)
+                if event:
+                    self._remember(event.pop('action'), event)
         except Exception as e:
             logging.error(f"Error loading metrics: {e}")
-            return {}
-            
-    def save_metrics(self):
+
+    def _migrate_legacy(self, legacy: Dict):
+        """Convertește o singură dată vechiul metrics.json în jurnal append-only"""
+        for action_type, events in legacy.items():
+            for event in events:
+                self._pending.append({'action': action_type, **event})
+                self._count(action_type, event.get('success', False))
+        self.save_metrics()
+        logging.info(f"Migrated {len(legacy)} legacy metric series to {self.events_file}")
+
+    @staticmethod
+    def _parse_event(line: str):
         try:
-            with open(self.metrics_file, 'w') as f:
-                json.dump(self.metrics, f, indent=2)
+            return json.loads(line)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _read_tail(path: str, max_lines: int, block_size: int = 65536) -> List[str]:
+        """Citește ultimele max_lines linii fără a parcurge tot fișierul"""
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b''
+            while position > 0 and data.count(b'\n') <= max_lines:
+                step = min(block_size, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+        lines = data.decode('utf-8', errors='replace').splitlines()
+        if position > 0:
+            lines = lines[1:]  # prima linie poate fi incompletă
+        return lines[-max_lines:]
+
+    def _remember(self, action_type: str, action_data: Dict):
+        buffer = self.metrics.get(action_type)
+        if buffer is None:
+            buffer = self.metrics.setdefault(action_type, deque(maxlen=self.max_recent))
+        buffer.append(action_data)
+
+    def _count(self, action_type: str, success: bool):
+        self._totals.add((action_type, 'success' if success else 'failure'))
+
+    def _persist_count(self, action_type: str, success: bool):
+        counters = self._persisted.setdefault(action_type, {'success': 0, 'failure': 0})
+        counters['success' if success else 'failure'] += 1
+
+    def save_metrics(self, block: bool = True):
+        """Adaugă în jurnal doar evenimentele noi și rescrie contoarele"""
+        if not self._pending:
+            return
+        # Un singur thread scrie pe disc; ceilalți nu așteaptă după el
+        if not self._flush_lock.acquire(blocking=block):
+            return
+        try:
+            self._flush_pending()
+        finally:
+            self._flush_lock.release()
+
+    def _flush_pending(self):
+        pending = []
+        while True:
+            try:
+                pending.append(self._pending.popleft())
+            except IndexError:
+                break
+        if not pending:
+            return
+        try:
+            with open(self.events_file, 'a') as f:
+                f.write(''.join(json.dumps(event) + '\n' for event in pending))
+                self._offset = f.tell()
+            for event in pending:
+                self._persist_count(event['action'], event['success'])
+
+            tmp_file = self.metrics_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump({'totals': self._persisted, 'offset': self._offset}, f)
+            os.replace(tmp_file, self.metrics_file)
         except Exception as e:
             logging.error(f"Error saving metrics: {e}")
+        if self.rollups:
+            self.rollups.flush()
+        self._last_flush = time.monotonic()
+
+    @staticmethod
+    def classify_error(details: Dict) -> str:
+        """Încadrează o eroare într-una din categoriile de pe dashboard"""
+        status_code = details.get('status_code')
+        error = str(details.get('error', '')).lower()
+        if status_code == 429 or '429' in error or 'rate limit' in error:
+            return 'rate_limit'
+        if status_code in (401, 403) or 'auth' in error or 'login' in error:
+            return 'auth'
+        if any(word in error for word in ('connection', 'timeout', 'timed out', 'network')):
+            return 'network'
+        return 'other'
 
     def track_action(self, action_type: str, success: bool, details: Dict = None):
-        timestamp = datetime.now().isoformat()
-        
-        if action_type not in self.metrics:
-            self.metrics[action_type] = []
-            
+        # UTC cu offset explicit (+00:00): liniile vechi, fără offset, sunt în ora locală
+        timestamp = datetime.now(timezone.utc).isoformat()
+
         action_data = {
             'timestamp': timestamp,
             'success': success,
             'details': details or {}
         }
-        
-        self.metrics[action_type].append(action_data)
+
+        self._remember(action_type, action_data)
+        self._count(action_type, success)
+        self._pending.append({'action': action_type, **action_data})
+        if (len(self._pending) >= self.batch_size or
+                time.monotonic() - self._last_flush >= self.flush_interval):
+            self.save_metrics(block=False)
         
         # Actualizează statisticile zilnice
+        error_category = None
         if success:
-            if action_type in self.daily_stats:
-                self.daily_stats[action_type] += 1
-            self.daily_stats['successful_requests'] += 1
+            if action_type in DAILY_STAT_KEYS:
+                self._daily.add(action_type)
+            self._daily.add('successful_requests')
         else:
-            self.daily_stats['failed_requests'] += 1
-            if not success:
-                self.daily_stats['errors'] += 1
+            error_category = self.classify_error(action_data['details'])
+            self._daily.add('failed_requests')
+            self._daily.add('errors')
+            self._daily.add(f'{error_category}_errors')
+
+        if self.rollups:
+            self.rollups.add(action_type, success, error_category)
+
+        for listener in self._listeners:
+            try:
+                listener(action_type, action_data)
+            except Exception as e:
+                logging.error(f"Error in metrics listener: {e}")
+
+    def increment(self, counter: str, amount: int = 1):
+        """Contor simplu (ex. hit/miss de cache), separat de rata de succes"""
+        self._counters.add(counter, amount)
+
+    def get_counters(self) -> Dict[str, int]:
+        return self.counters
+
+    def add_listener(self, callback: Callable):
+        """Înregistrează un callback apelat la fiecare acțiune urmărită"""
+        self._listeners.append(callback)
+
+    def get_totals(self) -> Dict[str, Dict[str, int]]:
+        """Contoarele cumulate pe tip de acțiune, din toată istoria"""
+        return self.totals
 
     def get_daily_stats(self) -> Dict:
         return self.daily_stats
 
     def get_success_rate(self, action_type: str = None) -> float:
-        total = self.daily_stats['successful_requests'] + self.daily_stats['failed_requests']
+        daily_stats = self.daily_stats
+        total = daily_stats['successful_requests'] + daily_stats['failed_requests']
         if total == 0:
             return 0.0
-        return (self.daily_stats['successful_requests'] / total) * 100
+        return (daily_stats['successful_requests'] / total) * 100
 
     def reset_daily_stats(self):
-        for key in self.daily_stats:
-            self.daily_stats[key] = 0
\ No newline at end of file
+        # Doar mută punctul de referință; scriitorii nu sunt întrerupți
+        self._daily_offset = self._daily.snapshot()
\ No newline at end of file
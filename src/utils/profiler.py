@@ -0,0 +1,215 @@
+import logging
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from ..config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+
+def prune_captures(directory: Path, pattern: str, keep: int):
+    """Păstrează doar ultimele `keep` capturi care se potrivesc cu `pattern`"""
+    captures = sorted(directory.glob(pattern), key=lambda path: path.stat().st_mtime)
+    for path in captures[:-keep] if keep > 0 else captures:
+        try:
+            path.unlink()
+        except OSError as e:
+            logger.error(f"Error removing old capture {path.name}: {str(e)}")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get('__name__') or Path(code.co_filename).stem
+    return f"{module}:{code.co_name}:{frame.f_lineno}"
+
+
+class SamplingProfiler:
+    """Profiler prin eșantionare: un thread citește stivele tuturor thread-urilor
+
+    La fiecare `interval` secunde se ia `sys._current_frames()` și fiecare
+    stivă se numără în format colapsat (`thread;modul:funcție:linie;... N`),
+    direct utilizabil de flamegraph.pl / speedscope. Când profilerul e oprit
+    nu există niciun thread și niciun hook, deci costul e zero.
+    """
+
+    def __init__(self, out_dir: Path = None, interval: float = None,
+                 max_seconds: int = None, keep: int = None):
+        self.out_dir = Path(out_dir or Config.PROFILES_DIR)
+        self.interval = interval or Config.PROFILER_INTERVAL_MS / 1000
+        self.max_seconds = max_seconds or Config.PROFILER_MAX_SECONDS
+        self.keep = keep or Config.PROFILE_RETENTION_FILES
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._started_at: Optional[datetime] = None
+        self.last_capture: Optional[Path] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                "running": self.running,
+                "started_at": self._started_at.isoformat() if self._started_at else None,
+                "interval_ms": round(self.interval * 1000, 1),
+                "samples": self._samples,
+                "last_capture": self.last_capture.name if self.last_capture else None
+            }
+
+    def start(self, interval: float = None, seconds: int = None) -> bool:
+        """Pornește eșantionarea; se oprește singur după `seconds` (maxim max_seconds)"""
+        with self._lock:
+            if self._thread is not None:
+                return False
+            if interval:
+                self.interval = interval
+            duration = min(seconds or self.max_seconds, self.max_seconds)
+            self._stacks = Counter()
+            self._samples = 0
+            self._started_at = datetime.utcnow()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(duration,),
+                                            name='sampling-profiler', daemon=True)
+            self._thread.start()
+        logger.info(f"Sampling profiler started ({self.interval * 1000:.1f}ms, max {duration}s)")
+        return True
+
+    def stop(self) -> Optional[Path]:
+        """Oprește eșantionarea și întoarce fișierul cu stivele colapsate"""
+        with self._lock:
+            thread = self._thread
+        if thread is None:
+            return None
+        self._stop.set()
+        if thread is not threading.current_thread():
+            thread.join()
+        return self.last_capture
+
+    def _run(self, duration: int):
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + duration
+        try:
+            while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_id:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_label(frame))
+                        frame = frame.f_back
+                    stack.append(names.get(thread_id, str(thread_id)))
+                    self._stacks[';'.join(reversed(stack))] += 1
+                self._samples += 1
+        finally:
+            self._write_capture()
+            with self._lock:
+                self._thread = None
+
+    def _write_capture(self):
+        try:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            path = self.out_dir / f"profile_{self._started_at.strftime('%Y%m%d_%H%M%S')}.collapsed"
+            with open(path, 'w') as f:
+                for stack, count in self._stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            self.last_capture = path
+            prune_captures(self.out_dir, 'profile_*.collapsed', self.keep)
+            logger.info(f"Sampling profiler stopped: {self._samples} samples written to {path.name}")
+        except OSError as e:
+            logger.error(f"Error writing profiler capture: {str(e)}")
+
+
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+class JobMemoryCapture:
+    """Captura tracemalloc a unui job, de la start() până la finish()
+
+    Pentru job-urile care doar pun acțiuni în coadă, finish() se apelează din
+    coadă după ultima acțiune, ca snapshot-ul să acopere munca reală.
+    """
+
+    def __init__(self, job_name: str, out_dir: Path = None, top: int = 30):
+        self.job_name = job_name
+        self.out_dir = Path(out_dir or Config.PROFILES_DIR)
+        self.top = top
+        self.started_at = datetime.utcnow()
+        self._start = time.perf_counter()
+        self._finished = False
+        global _tracemalloc_users
+        with _tracemalloc_lock:
+            # Job-urile se pot suprapune; tracing-ul se oprește la ultimul
+            if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start(Config.TRACEMALLOC_FRAMES)
+            _tracemalloc_users += 1
+            tracemalloc.reset_peak()
+
+    def finish(self):
+        global _tracemalloc_users
+        if self._finished:
+            return
+        self._finished = True
+        elapsed = time.perf_counter() - self._start
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+        ))
+        with _tracemalloc_lock:
+            _tracemalloc_users -= 1
+            if _tracemalloc_users == 0:
+                tracemalloc.stop()
+        _write_memory_capture(self.out_dir, self.job_name, self.started_at,
+                              elapsed, current, peak, snapshot, self.top)
+
+
+def start_job_memory_profile(job_name: str, out_dir: Path = None) -> Optional[JobMemoryCapture]:
+    """Pornește captura doar cu Config.JOB_TRACEMALLOC; altfel None, fără niciun cost"""
+    if not Config.JOB_TRACEMALLOC:
+        return None
+    return JobMemoryCapture(job_name, out_dir)
+
+
+@contextmanager
+def job_memory_profile(job_name: str, out_dir: Path = None):
+    """Captura tracemalloc pentru un job care își face toată munca în thread-ul curent"""
+    capture = start_job_memory_profile(job_name, out_dir)
+    try:
+        yield
+    finally:
+        if capture:
+            capture.finish()
+
+
+def _write_memory_capture(out_dir: Path, job_name: str, started_at: datetime, elapsed: float,
+                          current: int, peak: int, snapshot, top: int):
+    try:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        path = out_dir / f"tracemalloc_{job_name}_{started_at.strftime('%Y%m%d_%H%M%S')}.txt"
+        with open(path, 'w') as f:
+            f.write(f"job: {job_name}\nstarted_at: {started_at.isoformat()}\n"
+                    f"duration_s: {elapsed:.3f}\n"
+                    f"traced_current_kib: {current / 1024:.1f}\n"
+                    f"traced_peak_kib: {peak / 1024:.1f}\n\n")
+            for stat in snapshot.statistics('traceback')[:top]:
+                f.write(f"{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+                for line in stat.traceback.format(most_recent_first=True):
+                    f.write(f"    {line}\n")
+        prune_captures(out_dir, f'tracemalloc_{job_name}_*.txt', Config.PROFILE_RETENTION_FILES)
+        logger.info(f"Job {job_name}: peak traced memory {peak / 1024:.1f} KiB, "
+                    f"written to {path.name}")
+    except OSError as e:
+        logger.error(f"Error writing tracemalloc capture: {str(e)}")
@@ -0,0 +1,108 @@
+import sqlite3
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class SQLiteRateLimitStore:
+    """Jurnal durabil al acțiunilor, partajat între procese (SQLite în mod WAL)"""
+
+    def __init__(self, db_path: str, busy_timeout_ms: int = 5000):
+        self.db_path = str(db_path)
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_log ("
+            " id INTEGER PRIMARY KEY,"
+            " action_type TEXT NOT NULL,"
+            " ts REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_rate_limit_log_action_ts "
+            "ON rate_limit_log (action_type, ts)"
+        )
+        # load_since și prune filtrează doar după ts
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_rate_limit_log_ts ON rate_limit_log (ts)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        """O conexiune per thread; tranzacțiile sunt gestionate explicit"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None,
+                                   timeout=self.busy_timeout_ms / 1000)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def has_changed(self) -> bool:
+        """True dacă alte conexiuni au scris de la ultima verificare din acest thread
+
+        PRAGMA data_version e un contor per conexiune, deci ultima valoare văzută
+        se păstrează lângă conexiunea thread-ului, nu se compară între thread-uri.
+        """
+        conn = self._conn()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        changed = data_version != getattr(self._local, 'data_version', None)
+        self._local.data_version = data_version
+        return changed
+
+    def load_since(self, since: float) -> Dict[str, List[float]]:
+        """Acțiunile mai noi de `since`, grupate pe tip și ordonate"""
+        actions: Dict[str, List[float]] = {}
+        rows = self._conn().execute(
+            "SELECT action_type, ts FROM rate_limit_log WHERE ts > ? ORDER BY ts",
+            (since,)
+        )
+        for action_type, ts in rows:
+            actions.setdefault(action_type, []).append(ts)
+        return actions
+
+    def append(self, action_type: str, ts: float):
+        self._conn().execute(
+            "INSERT INTO rate_limit_log (action_type, ts) VALUES (?, ?)",
+            (action_type, ts)
+        )
+
+    def try_acquire(self, action_type: str, ts: float, day_start: float,
+                    hour_cutoff: float, max_per_day: int, max_per_hour: int) -> Optional[int]:
+        """Verifică limitele și înregistrează acțiunea într-o singură tranzacție
+
+        Întoarce id-ul rândului (tokenul rezervării) sau None dacă limita e atinsă.
+        """
+        conn = self._conn()
+        # BEGIN IMMEDIATE ia lock-ul de scriere, deci verificarea e atomică între procese
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            daily_count, hourly_count = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(ts > ?), 0) FROM rate_limit_log "
+                "WHERE action_type = ? AND ts > ?",
+                (hour_cutoff, action_type, day_start)
+            ).fetchone()
+            if daily_count >= max_per_day or hourly_count >= max_per_hour:
+                conn.execute("ROLLBACK")
+                return None
+            row_id = conn.execute(
+                "INSERT INTO rate_limit_log (action_type, ts) VALUES (?, ?)",
+                (action_type, ts)
+            ).lastrowid
+            conn.execute("COMMIT")
+            return row_id
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def remove(self, row_id: int):
+        """Eliberează o rezervare făcută cu try_acquire (doar rândul ei)"""
+        self._conn().execute("DELETE FROM rate_limit_log WHERE id = ?", (row_id,))
+
+    def prune(self, before: float):
+        """Șterge acțiunile din zilele trecute"""
+        self._conn().execute("DELETE FROM rate_limit_log WHERE ts <= ?", (before,))
@@ -1,52 +1,158 @@
+import threading
 import time
 import logging
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Deque, Dict, NamedTuple, Optional
+from ..config.settings import Config
+from .rate_limit_store import SQLiteRateLimitStore
 
 logger = logging.getLogger(__name__)
 
+class Reservation(NamedTuple):
+    """Rezervarea făcută de try_acquire; release o anulează exact pe ea"""
+    ts: float
+    row_id: Optional[int] = None
+
 class RateLimiter:
-    def __init__(self):
+    def __init__(self, store: Optional[SQLiteRateLimitStore] = None):
+        max_per_day = Config.MAX_ACTIONS_PER_DAY
         self.limits = {
-            'like': {'max': 350, 'per_hour': 50},
-            'comment': {'max': 180, 'per_hour': 20},
-            'follow': {'max': 200, 'per_hour': 30},
-            'unfollow': {'max': 200, 'per_hour': 30},
+            'like': {'max': max_per_day['like'], 'per_hour': 50},
+            'comment': {'max': max_per_day['comment'], 'per_hour': 20},
+            'follow': {'max': max_per_day['follow'], 'per_hour': 30},
+            'unfollow': {'max': max_per_day['unfollow'], 'per_hour': 30},
         }
-        self.actions = {action: [] for action in self.limits.keys()}
-        
+        # Timestamp-uri (epoch) ordonate: acțiunile de azi și cele din ultima oră
+        self.actions: Dict[str, Deque[float]] = {action: deque() for action in self.limits}
+        self.recent: Dict[str, Deque[float]] = {action: deque() for action in self.limits}
+        # (miezul nopții de azi, miezul nopții de mâine), înlocuite atomic
+        self._day_bounds = (0.0, 0.0)
+
+        # Câte un lock per tip de acțiune: verificarea și înregistrarea sunt atomice
+        self._locks = {action: threading.Lock() for action in self.limits}
+        self._sync_lock = threading.Lock()
+
+        # Starea durabilă: la pornire se citesc doar acțiunile de azi
+        self.store = store
+        self._pruned_before = None
+        if self.store:
+            self._sync_from_store()
+
+    def _sync_from_store(self):
+        """Reîncarcă acțiunile de azi dacă alt proces a scris între timp"""
+        # Nu se apelează niciodată ținând un lock de acțiune
+        with self._sync_lock:
+            # Jurnalul nu crește nelimitat: zilele trecute se șterg la schimbarea zilei
+            day_start = self._get_day_start(time.time())
+            if day_start != self._pruned_before:
+                self.store.prune(day_start)
+                self._pruned_before = day_start
+
+            if not self.store.has_changed():
+                return
+
+            stored = self.store.load_since(day_start)
+            for action_type in self.limits:
+                timestamps = stored.get(action_type, [])
+                with self._locks[action_type]:
+                    self.actions[action_type] = deque(timestamps)
+                    self.recent[action_type] = deque(timestamps)
+
+    def _get_day_start(self, now: float) -> float:
+        """Miezul nopții local, recalculat doar la schimbarea zilei"""
+        day_start, next_day_start = self._day_bounds
+        if now >= next_day_start:
+            midnight = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+            day_start = midnight.timestamp()
+            self._day_bounds = (day_start, (midnight + timedelta(days=1)).timestamp())
+        return day_start
+
+    def _within_limits(self, action_type: str, now: float, day_start: float) -> bool:
+        """Verificarea propriu-zisă; se apelează cu lock-ul acțiunii luat"""
+        # Ora se numără tot doar din acțiunile de azi
+        hour_cutoff = max(day_start, now - 3600)
+
+        # Curăță acțiunile vechi (amortizat O(1))
+        today = self.actions[action_type]
+        while today and today[0] <= day_start:
+            today.popleft()
+        last_hour = self.recent[action_type]
+        while last_hour and last_hour[0] <= hour_cutoff:
+            last_hour.popleft()
+
+        # Verifică limitele
+        limits = self.limits[action_type]
+        return len(today) < limits['max'] and len(last_hour) < limits['per_hour']
+
     def can_perform_action(self, action_type: str) -> bool:
         if action_type not in self.limits:
             return False
-            
-        now = datetime.now()
-        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        hour_ago = now - timedelta(hours=1)
-        
-        # Curăță acțiunile vechi
-        self.actions[action_type] = [
-            timestamp for timestamp in self.actions[action_type]
-            if timestamp > day_start
-        ]
-        
-        # Verifică limitele
-        daily_count = len(self.actions[action_type])
-        hourly_count = len([
-            timestamp for timestamp in self.actions[action_type]
-            if timestamp > hour_ago
-        ])
-        
-        if (daily_count >= self.limits[action_type]['max'] or
-            hourly_count >= self.limits[action_type]['per_hour']):
+
+        if self.store:
+            self._sync_from_store()
+
+        now = time.time()
+        day_start = self._get_day_start(now)
+        with self._locks[action_type]:
+            allowed = self._within_limits(action_type, now, day_start)
+
+        if not allowed:
             logger.warning(f"Rate limit reached for {action_type}")
-            return False
-            
-        return True
-        
+        return allowed
+
     def log_action(self, action_type: str):
         """Înregistrează o acțiune nouă"""
         if action_type in self.limits:
-            self.actions[action_type].append(datetime.now())
+            with self._locks[action_type]:
+                now = time.time()
+                self.actions[action_type].append(now)
+                self.recent[action_type].append(now)
+                if self.store:
+                    self.store.append(action_type, now)
+
+    def try_acquire(self, action_type: str) -> Optional[Reservation]:
+        """Verifică limitele și rezervă acțiunea atomic (și între procese)"""
+        if action_type not in self.limits:
+            return None
+        if self.store:
+            self._sync_from_store()
+
+        reservation = None
+        with self._locks[action_type]:
+            now = time.time()
+            day_start = self._get_day_start(now)
+            if self._within_limits(action_type, now, day_start):
+                if self.store:
+                    limits = self.limits[action_type]
+                    row_id = self.store.try_acquire(action_type, now, day_start,
+                                                    max(day_start, now - 3600),
+                                                    limits['max'], limits['per_hour'])
+                    if row_id is not None:
+                        reservation = Reservation(now, row_id)
+                else:
+                    reservation = Reservation(now)
+            if reservation:
+                self.actions[action_type].append(now)
+                self.recent[action_type].append(now)
+
+        if not reservation:
+            logger.warning(f"Rate limit reached for {action_type}")
+        return reservation
+
+    def release(self, action_type: str, reservation: Reservation):
+        """Anulează o rezervare (acțiunea nu a reușit)"""
+        if action_type not in self.limits:
+            return
+        with self._locks[action_type]:
+            # După o resincronizare, ultima intrare poate fi rezervarea altui proces
+            for timestamps in (self.actions[action_type], self.recent[action_type]):
+                try:
+                    timestamps.remove(reservation.ts)
+                except ValueError:
+                    pass
+            if self.store and reservation.row_id is not None:
+                self.store.remove(reservation.row_id)
             
     def get_delay(self, action_type: str) -> float:
         """Calculează timpul de așteptare între acțiuni"""
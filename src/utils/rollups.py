@@ -0,0 +1,133 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert
+
+from ..config.settings import Config
+from ..models.rollup import MetricRollup
+
+logger = logging.getLogger(__name__)
+
+ERROR_CATEGORIES = ('rate_limit', 'network', 'auth', 'other')
+
+_TRUNCATE = {
+    'minute': lambda ts: ts.replace(second=0, microsecond=0),
+    'hour': lambda ts: ts.replace(minute=0, second=0, microsecond=0),
+    'day': lambda ts: ts.replace(hour=0, minute=0, second=0, microsecond=0),
+}
+
+
+class RollupAggregator:
+    """Agregă acțiunile în bucket-uri pe minut, oră și zi
+
+    Fiecare eveniment este adăugat simultan în toate cele trei rezoluții, iar
+    rezoluțiile fine sunt șterse după ROLLUP_RETENTION_DAYS, astfel încât
+    istoricul lung rămâne doar la granularitatea zilnică.
+    """
+
+    def __init__(self, session_factory: Callable, retention_days: Dict[str, int] = None,
+                 prune_interval: timedelta = timedelta(hours=1)):
+        self.session_factory = session_factory
+        self.retention_days = retention_days or Config.ROLLUP_RETENTION_DAYS
+        self.prune_interval = prune_interval
+        self._pending: Dict[Tuple[str, datetime, str], Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._last_prune = datetime.min
+
+    def add(self, action_type: str, success: bool, error_category: Optional[str] = None,
+            when: Optional[datetime] = None):
+        """Adaugă un eveniment în bucket-urile în memorie"""
+        when = when or datetime.utcnow()
+        with self._lock:
+            for resolution, truncate in _TRUNCATE.items():
+                key = (resolution, truncate(when), action_type)
+                counters = self._pending.get(key)
+                if counters is None:
+                    counters = self._pending[key] = dict.fromkeys(
+                        ['success_count', 'failure_count'] +
+                        [f'{category}_errors' for category in ERROR_CATEGORIES], 0
+                    )
+                if success:
+                    counters['success_count'] += 1
+                else:
+                    counters['failure_count'] += 1
+                    counters[f'{error_category or "other"}_errors'] += 1
+
+    def flush(self):
+        """Scrie bucket-urile acumulate printr-un singur upsert"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        rows = [
+            {'resolution': resolution, 'bucket_start': bucket, 'action_type': action_type,
+             **counters}
+            for (resolution, bucket, action_type), counters in pending.items()
+        ]
+        stmt = insert(MetricRollup.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['resolution', 'bucket_start', 'action_type'],
+            set_={
+                column: getattr(MetricRollup.__table__.c, column) + getattr(stmt.excluded, column)
+                for column in rows[0] if column.endswith(('_count', '_errors'))
+            }
+        )
+
+        session = self.session_factory()
+        try:
+            session.execute(stmt, rows)
+            if datetime.utcnow() - self._last_prune >= self.prune_interval:
+                self._prune(session)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error flushing metric rollups: {e}")
+        finally:
+            session.close()
+
+    def _prune(self, session):
+        """Șterge bucket-urile care au depășit retenția rezoluției lor"""
+        now = datetime.utcnow()
+        for resolution, days in self.retention_days.items():
+            session.query(MetricRollup).filter(
+                MetricRollup.resolution == resolution,
+                MetricRollup.bucket_start < now - timedelta(days=days)
+            ).delete(synchronize_session=False)
+        self._last_prune = now
+
+    def resolution_for(self, days: int) -> str:
+        """Alege cea mai fină rezoluție care încă acoperă intervalul cerut"""
+        for resolution in ('minute', 'hour', 'day'):
+            if days <= self.retention_days.get(resolution, 0):
+                return resolution
+        return 'day'
+
+    def get_history(self, session, days: int, action_type: Optional[str] = None) -> List[Dict]:
+        """Seria istorică din rânduri pre-agregate, fără scanarea evenimentelor"""
+        resolution = self.resolution_for(days)
+        start = _TRUNCATE[resolution](datetime.utcnow() - timedelta(days=days))
+        query = session.query(
+            MetricRollup.bucket_start,
+            func.sum(MetricRollup.success_count),
+            func.sum(MetricRollup.failure_count),
+            *[func.sum(getattr(MetricRollup, f'{category}_errors'))
+              for category in ERROR_CATEGORIES]
+        ).filter(
+            MetricRollup.resolution == resolution,
+            MetricRollup.bucket_start >= start
+        )
+        if action_type:
+            query = query.filter(MetricRollup.action_type == action_type)
+
+        rows = query.group_by(MetricRollup.bucket_start).order_by(MetricRollup.bucket_start)
+        return [{
+            "bucket": bucket.isoformat(),
+            "resolution": resolution,
+            "success": success,
+            "failure": failure,
+            "errors": dict(zip(ERROR_CATEGORIES, errors))
+        } for bucket, success, failure, *errors in rows]
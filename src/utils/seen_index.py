@@ -0,0 +1,141 @@
+import hashlib
+import logging
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable, Iterable, List, Set
+
+from sqlalchemy import select
+
+from ..models.conversation import Conversation
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b'SEEN1\0\0\0'
+SNAPSHOT_HEADER = struct.Struct('<8sQQ')  # magic, max conversation id, număr de hash-uri
+
+
+def shortcode_hash(shortcode: str) -> int:
+    """Hash de 64 de biți; coliziunile sunt neglijabile la câteva milioane de postări"""
+    return int.from_bytes(hashlib.blake2b(shortcode.encode(), digest_size=8).digest(), 'little')
+
+
+class SeenShortcodeIndex:
+    """Shortcode-urile deja văzute, ca array sortat de hash-uri pe 64 de biți
+
+    Încărcat dintr-un snapshot la pornire și completat incremental din
+    conversațiile cu id mai mare decât cel din snapshot. Verificările pentru o
+    pagină de feed se fac în memorie (8 bytes per postare), fără request la DB.
+    """
+
+    def __init__(self, session_factory: Callable, snapshot_path: str,
+                 merge_threshold: int = 4096):
+        self.session_factory = session_factory
+        self.snapshot_path = Path(snapshot_path)
+        self.merge_threshold = merge_threshold
+        self._hashes = array('Q')
+        # Adăugările recente; se contopesc în array când devin prea multe
+        self._recent: Set[int] = set()
+        self._max_id = 0
+        self._lock = threading.Lock()
+        self._load_snapshot()
+
+    def __len__(self) -> int:
+        return len(self._hashes) + len(self._recent)
+
+    def _load_snapshot(self):
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                magic, max_id, count = SNAPSHOT_HEADER.unpack(f.read(SNAPSHOT_HEADER.size))
+                if magic != SNAPSHOT_MAGIC:
+                    raise ValueError("unknown snapshot format")
+                hashes = array('Q')
+                hashes.fromfile(f, count)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, EOFError, struct.error) as e:
+            logger.error(f"Error loading seen-shortcode snapshot, rebuilding: {str(e)}")
+            return
+        self._hashes, self._max_id = hashes, max_id
+
+    def save(self):
+        """Scrie snapshot-ul atomic (array-ul contopit + id-ul maxim acoperit)"""
+        with self._lock:
+            self._merge()
+            hashes, max_id = self._hashes, self._max_id
+        tmp_path = self.snapshot_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, max_id, len(hashes)))
+            hashes.tofile(f)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def refresh(self, batch_size: int = 10000) -> int:
+        """Adaugă conversațiile create după ultimul id cunoscut; întoarce câte s-au adăugat"""
+        added = 0
+        session = self.session_factory()
+        try:
+            while True:
+                rows = session.execute(
+                    select(Conversation.id, Conversation.post_shortcode)
+                    .where(Conversation.id > self._max_id)
+                    .order_by(Conversation.id)
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+                with self._lock:
+                    self._recent.update(shortcode_hash(shortcode) for _, shortcode in rows)
+                    self._max_id = rows[-1][0]
+                added += len(rows)
+        finally:
+            session.close()
+        with self._lock:
+            if len(self._recent) >= self.merge_threshold:
+                self._merge()
+        return added
+
+    def add(self, shortcodes: Iterable[str]):
+        """Marchează shortcode-urile ca văzute (ex. după ce conversațiile au fost scrise)"""
+        with self._lock:
+            self._recent.update(shortcode_hash(shortcode) for shortcode in shortcodes)
+            if len(self._recent) >= self.merge_threshold:
+                self._merge()
+
+    def _merge(self):
+        # Interclasare a două secvențe sortate: array-ul rămâne împachetat (8 bytes
+        # per intrare), doar hash-urile noi sunt int-uri Python
+        if not self._recent:
+            return
+        hashes = self._hashes
+        merged = array('Q')
+        start = 0
+        for value in sorted(self._recent):
+            i = bisect_left(hashes, value, start)
+            merged.extend(hashes[start:i])
+            if i == len(hashes) or hashes[i] != value:
+                merged.append(value)
+            start = i
+        merged.extend(hashes[start:])
+        self._hashes = merged
+        self._recent = set()
+
+    def _contains_hash(self, value: int, hashes: array, recent: Set[int]) -> bool:
+        if value in recent:
+            return True
+        i = bisect_left(hashes, value)
+        return i < len(hashes) and hashes[i] == value
+
+    def contains(self, shortcode: str) -> bool:
+        return self._contains_hash(shortcode_hash(shortcode), self._hashes, self._recent)
+
+    def unseen(self, shortcodes: Iterable[str]) -> List[str]:
+        """Shortcode-urile dintr-o pagină de feed care nu au mai fost văzute"""
+        # Referințele se citesc o dată; _merge le înlocuiește, nu le modifică
+        hashes, recent = self._hashes, self._recent
+        return [
+            shortcode for shortcode in shortcodes
+            if not self._contains_hash(shortcode_hash(shortcode), hashes, recent)
+        ]